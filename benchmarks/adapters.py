@@ -0,0 +1,46 @@
+"""
+read throughput of a pydantic typed RedisList in each read mode
+
+    python benchmarks/adapters.py redis://127.0.0.1:6379/15
+"""
+import sys
+import time
+from typing import List
+
+from pydantic import BaseModel
+
+from redis_cooker.adapters import PydanticAdapter
+from redis_cooker.clients import set_connection_url
+from redis_cooker.collections import RedisList
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    tags: List[str]
+    price: float
+
+
+def main(url: str, size: int = 10000, rounds: int = 5) -> None:
+    set_connection_url(url)
+    key = "Benchmark:Adapters"
+    RedisList(key).clear()
+    RedisList(key, schema=Item).extend({"id": i, "name": f"item {i}", "tags": ["a", "b"], "price": i / 3} for i in range(size))
+
+    print(f"{'mode':<40}{'values/s':>12}")
+    modes = [
+        ("schema=Item", Item),
+        ("PydanticAdapter(as_model=True)", PydanticAdapter(Item, as_model=True)),
+        ("PydanticAdapter(validate_on_read=False)", PydanticAdapter(Item, validate_on_read=False)),
+        ("construct(), as_model=True", PydanticAdapter(Item, validate_on_read=False, as_model=True)),
+    ]
+    for name, schema in modes:
+        collection = RedisList(key, schema=schema)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            list(collection)
+        print(f"{name:<40}{size * rounds / (time.perf_counter() - start):>12.0f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2] or ["redis://127.0.0.1:6379/15"])
@@ -0,0 +1,73 @@
+"""
+contention benchmark of RedisLock, RedisSemaphore and RedisDict.atomic_update
+
+    python benchmarks/locks.py redis://127.0.0.1:6379/15
+"""
+import sys
+import time
+import threading
+import statistics
+from typing import Callable, List
+
+from redis_cooker.clients import set_connection_url, current_redis_client
+from redis_cooker.collections import RedisDict
+from redis_cooker.locks import RedisLock, RedisSemaphore
+
+
+def _run(workers: int, operations: int, operation: Callable[[], None]) -> List[float]:
+    latencies = []
+    lock = threading.Lock()
+
+    def work():
+        local = []
+        for _ in range(operations):
+            start = time.perf_counter()
+            operation()
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=work) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies
+
+
+def _report(name: str, workers: int, seconds: float, latencies: List[float]) -> None:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name:<24}{workers:>8}{len(latencies) / seconds:>12.0f}"
+        f"{statistics.median(latencies) * 1000:>10.2f}{p99 * 1000:>10.2f}"
+    )
+
+
+def main(url: str, operations: int = 200) -> None:
+    set_connection_url(url)
+    current_redis_client().delete(RedisLock("Benchmark").key, RedisSemaphore("Benchmark", 1).key, "Benchmark:Dict")
+    print(f"{'operation':<24}{'workers':>8}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+
+    for workers in (1, 4, 16):
+        def locked():
+            with RedisLock("Benchmark"):
+                pass
+
+        def semaphore():
+            with RedisSemaphore("Benchmark", 4):
+                pass
+
+        d = RedisDict("Benchmark:Dict")
+
+        def atomic_update():
+            d.atomic_update("counter", lambda v: v + 1, default=0, retries=1000)
+
+        for name, operation in [("RedisLock", locked), ("RedisSemaphore(4)", semaphore), ("atomic_update", atomic_update)]:
+            start = time.perf_counter()
+            latencies = _run(workers, operations, operation)
+            _report(name, workers, time.perf_counter() - start, latencies)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2] or ["redis://127.0.0.1:6379/15"])
@@ -0,0 +1,36 @@
+"""
+decisions per second per core of RedisRateLimiter, one at a time and pipelined
+
+    python benchmarks/rate_limit.py redis://127.0.0.1:6379/15
+"""
+import sys
+import time
+
+from redis_cooker.clients import set_connection_url
+from redis_cooker.rate_limit import RedisRateLimiter, Strategy
+
+
+def main(url: str, decisions: int = 20000, batch_size: int = 100) -> None:
+    set_connection_url(url)
+    keys = [f"user:{i}" for i in range(1000)]
+    print(f"{'strategy':<24}{'mode':>12}{'decisions/s':>14}{'client cpu us':>16}")
+
+    for strategy in Strategy:
+        limiter = RedisRateLimiter("Benchmark", 10 ** 6, 1, strategy=strategy)
+        for key in keys:
+            limiter.reset(key)
+
+        for mode in ("single", "pipelined"):
+            start, cpu = time.perf_counter(), time.process_time()
+            if mode == "single":
+                for i in range(decisions):
+                    limiter.try_acquire(keys[i % len(keys)])
+            else:
+                for i in range(0, decisions, batch_size):
+                    limiter.try_acquire_many(keys[j % len(keys)] for j in range(i, i + batch_size))
+            seconds, cpu = time.perf_counter() - start, time.process_time() - cpu
+            print(f"{strategy.value:<24}{mode:>12}{decisions / seconds:>14.0f}{cpu / decisions * 10 ** 6:>16.1f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2] or ["redis://127.0.0.1:6379/15"])
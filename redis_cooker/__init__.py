@@ -0,0 +1,3 @@
+from .memoization import memoize
+
+__all__ = ["memoize"]
@@ -2,6 +2,7 @@ import random
 from typing import List
 
 from attr import dataclass
+from redis.cluster import RedisCluster
 from redis.exceptions import WatchError
 
 from .clients import current_redis_client
@@ -18,13 +19,16 @@ class ABNTest:
 
     def __init__(self, topic: str, choices: List[Choice]):
         assert all(i.value > 0 for i in choices), "Choice.value must > 0"
+        self.redis = current_redis_client()
+        # hash-tagged only on cluster, so the counters of existing standalone deployments keep their keys
+        topic = f"{{{topic}}}" if isinstance(self.redis, RedisCluster) else topic
         prefix_key = self.key_delimiter.join(["RedisCooker", type(self).__name__, topic])
         self.keys = {self.key_delimiter.join([prefix_key, i.name]): i.value for i in choices}
-        self.redis = current_redis_client()
         self._register_all_keys()
 
     def fetch(self) -> str:
-        with self.redis.pipeline() as pipeline:
+        # keys share the {topic} hash tag on cluster, so WATCH/MULTI run on one node
+        with self.redis.pipeline(transaction=True) as pipeline:
             while True:
                 try:
                     keys = self.keys.keys()
@@ -1,6 +1,19 @@
 import json
 from abc import ABCMeta, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Union
+
+try:
+    from pydantic import TypeAdapter
+except ImportError:  # pragma: no cover
+    TypeAdapter = None
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def _json_array(data: List[BytesLike]) -> List:
+    """one json.loads over all values is much faster than one per value, unless a value is not one document"""
+    _data = json.loads(b"".join((b"[", b",".join(data), b"]")))
+    return _data if len(_data) == len(data) else [json.loads(bytes(i)) for i in data]
 
 
 class BaseAdapter(metaclass=ABCMeta):
@@ -8,21 +21,145 @@ class BaseAdapter(metaclass=ABCMeta):
         self.adaptee = adaptee
 
     @abstractmethod
-    def loads(self, data: bytes) -> Any:
+    def loads(self, data: BytesLike) -> Any:
         pass
 
     @abstractmethod
-    def dumps(self, data: Any) -> str:
+    def dumps(self, data: Any) -> Union[str, BytesLike]:
         pass
 
+    def bulk_loads(self, data: List[BytesLike]) -> List:
+        return [self.loads(i) for i in data]
+
+    def validate_fields(self, partial: Dict) -> Dict:
+        """validate some fields of a document, returned as JSON compatible values. TypeError if adaptee is not ours"""
+        raise TypeError(f"{type(self).__name__} does not support partial documents")
+
+
+class BytesAdapter(BaseAdapter):
+    """schema=bytes stores and returns values untouched, without any copy on our side"""
+    def loads(self, data: BytesLike) -> BytesLike:
+        if self.adaptee is not bytes:
+            raise TypeError(f"{self.adaptee} is not bytes")
+        return data
+
+    def dumps(self, data: BytesLike) -> BytesLike:
+        if self.adaptee is not bytes or not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError(f"{data!r} is not bytes-like")
+        return data
+
+
+class PydanticV2Adapter(BaseAdapter):
+    """
+    pydantic v2 models, or any other type pydantic v2 validates, through TypeAdapters cached per schema.
+    Values are validated from and dumped to JSON bytes by pydantic-core directly.
+    Options are the same as PydanticAdapter.
+    """
+    _type_adapters: Dict[Any, Any] = {}
+
+    def __init__(self, adaptee: Any, *, validate_on_read: bool = True, as_model: bool = False):
+        super().__init__(adaptee)
+        self.validate_on_read = validate_on_read
+        self.as_model = as_model
+
+    def _type_adapter(self, many: bool = False) -> Any:
+        key = (self.adaptee, many)
+        try:
+            return self._type_adapters[key]
+        except KeyError:
+            pass
+
+        if TypeAdapter is None or hasattr(self.adaptee, "__fields__") and not hasattr(self.adaptee, "model_fields"):
+            raise TypeError(f"{self.adaptee} is not a pydantic v2 type")
+        adapter = self._type_adapters[key] = TypeAdapter(List[self.adaptee] if many else self.adaptee)
+        return adapter
+
+    @property
+    def _is_model(self) -> bool:
+        return hasattr(self.adaptee, "model_construct")
+
+    def _construct(self, data: Any) -> Any:
+        if not self._is_model:
+            return data
+        if "root" in self.adaptee.model_fields and not isinstance(data, dict):
+            return self.adaptee.model_construct(data)
+        return self.adaptee.model_construct(**data)
+
+    def loads(self, data: BytesLike) -> Any:
+        adapter = self._type_adapter()
+        if not self.validate_on_read:
+            _data = json.loads(data)
+            return self._construct(_data) if self.as_model else _data
+
+        _data = adapter.validate_json(data)
+        return _data if self.as_model else adapter.dump_python(_data)
+
+    def dumps(self, data: Any) -> bytes:
+        adapter = self._type_adapter()
+        return adapter.dump_json(adapter.validate_python(data))
+
+    def bulk_loads(self, data: List[BytesLike]) -> List:
+        """the whole batch is validated by one validate_json call"""
+        adapter = self._type_adapter(many=True)
+        if not self.validate_on_read:
+            _data = _json_array(data)
+            return [self._construct(i) for i in _data] if self.as_model else _data
+
+        _data = adapter.validate_json(b"".join((b"[", b",".join(data), b"]")))
+        if len(_data) != len(data):
+            return [self.loads(i) for i in data]
+        return _data if self.as_model else adapter.dump_python(_data)
+
+    def validate_fields(self, partial: Dict) -> Dict:
+        self._type_adapter()
+        if not self._is_model or "root" in self.adaptee.model_fields:
+            raise TypeError(f"{self.adaptee} is not a pydantic model with fields")
+
+        model = self.adaptee.model_construct()
+        for name, value in partial.items():
+            _ = self.adaptee.model_fields[name]
+            model = self.adaptee.__pydantic_validator__.validate_assignment(model, name, value)
+        return model.model_dump(mode="json", include=set(partial))
+
 
 class PydanticAdapter(BaseAdapter):
+    """
+    validate_on_read=False trusts stored data: it is json decoded, or built with construct() when as_model=True.
+    as_model=True returns model instances instead of dicts.
+    """
     root = "__root__"
 
-    def loads(self, data: bytes) -> Any:
-        _data: Dict = self.adaptee.parse_raw(data).dict()
+    def __init__(self, adaptee: Any, *, validate_on_read: bool = True, as_model: bool = False):
+        super().__init__(adaptee)
+        self.validate_on_read = validate_on_read
+        self.as_model = as_model
+
+    def _output(self, model: Any) -> Any:
+        if self.as_model:
+            return model
+        _data: Dict = model.dict()
         return _data.get(self.root, _data)
 
+    def _construct(self, data: Any) -> Any:
+        if self.adaptee.__custom_root_type__:
+            return self.adaptee.construct(**{self.root: data})
+        return self.adaptee.construct(**data)
+
+    def loads(self, data: bytes) -> Any:
+        if self.validate_on_read:
+            return self._output(self.adaptee.parse_raw(data))
+        _data = json.loads(data)
+        return self._construct(_data) if self.as_model else _data
+
+    def bulk_loads(self, data: List[BytesLike]) -> List:
+        _data = _json_array(data)
+        if self.validate_on_read:
+            return [self._output(self.adaptee.parse_obj(self._wrap_root(i))) for i in _data]
+        return [self._construct(i) for i in _data] if self.as_model else _data
+
+    def _wrap_root(self, data: Any) -> Any:
+        return {self.root: data} if self.adaptee.__custom_root_type__ else data
+
     def dumps(self, data: Any) -> str:
         if self.adaptee.__custom_root_type__:
             data = {self.root: data}
@@ -34,12 +171,51 @@ class PydanticAdapter(BaseAdapter):
 
         return factory(data).json()
 
+    def validate_fields(self, partial: Dict) -> Dict:
+        if not hasattr(self.adaptee, "__fields__") or self.adaptee.__custom_root_type__:
+            raise TypeError(f"{self.adaptee} is not a pydantic model with fields")
+
+        validated, errors = {}, []
+        for name, value in partial.items():
+            field = self.adaptee.__fields__[name]
+            validated[name], error = field.validate(value, {}, loc=name, cls=self.adaptee)
+            error and errors.append(error)
+        if errors:
+            from pydantic import ValidationError
+            raise ValidationError(errors, self.adaptee)
+        return json.loads(json.dumps(validated, default=self.adaptee.__json_encoder__))
+
 
 class DRFAdapter(BaseAdapter):
-    def loads(self, data: bytes) -> Any:
-        serializer = self.adaptee(data=json.loads(data))
+    """validate_on_read=False trusts stored data and returns it json decoded"""
+    def __init__(self, adaptee: Any, *, validate_on_read: bool = True):
+        super().__init__(adaptee)
+        self.validate_on_read = validate_on_read
+
+    def _validated(self, data: Any) -> Any:
+        if not self.validate_on_read:
+            return data
+        serializer = self.adaptee(data=data)
         serializer.is_valid(raise_exception=True)
         return serializer.validated_data
 
+    def loads(self, data: bytes) -> Any:
+        return self._validated(json.loads(data))
+
+    def bulk_loads(self, data: List[BytesLike]) -> List:
+        return [self._validated(i) for i in _json_array(data)]
+
     def dumps(self, data: Any) -> str:
         return json.dumps(self.adaptee(data).data)
+
+    def validate_fields(self, partial: Dict) -> Dict:
+        if not hasattr(self.adaptee, "to_representation"):
+            raise TypeError(f"{self.adaptee} is not a serializer")
+
+        serializer = self.adaptee(data=partial, partial=True)
+        serializer.is_valid(raise_exception=True)
+        fields = serializer.fields
+        return json.loads(json.dumps({
+            name: fields[name].to_representation(serializer.validated_data[fields[name].source])
+            for name in partial
+        }))
@@ -2,10 +2,12 @@ from typing import Callable
 
 from redis.client import Script
 
+from .instrumentation import instrument
+
 __all__ = ["run_as_lua"]
 
 
-def run_as_lua(parameter_converter: Callable) -> Callable:
+def run_as_lua(parameter_converter: Callable, keys_converter: Callable = None) -> Callable:
     def create_lua_script(func: Callable) -> Callable:
         def __inner(self, *args, **kwargs) -> None:
             lua_attr: str = "_lua_"
@@ -15,8 +17,9 @@ def run_as_lua(parameter_converter: Callable) -> Callable:
                 script: Script = self.redis.register_script(func.__doc__)
                 setattr(func, lua_attr, script)
 
-            return script(keys=[self.key], args=parameter_converter(self, *args, **kwargs))
+            keys = [self.key] if keys_converter is None else keys_converter(self, *args, **kwargs)
+            return script(keys=keys, args=parameter_converter(self, *args, **kwargs), client=self.redis)
 
-        return __inner
+        return instrument(__inner, f"{func.__qualname__}:lua")
 
     return create_lua_script
@@ -0,0 +1,104 @@
+import os
+import time
+import queue
+import atexit
+import weakref
+import threading
+from typing import Any, Callable, List, Optional
+
+__all__ = ["WriteBehindBuffer"]
+
+_buffers = weakref.WeakSet()
+
+
+class WriteBehindBuffer:
+    """buffered writes reach redis after at most interval seconds, or earlier once batch_size is buffered"""
+    def __init__(
+            self, *, batch_size: int = 1000, interval: float = 0.1, capacity: int = 100000, timeout: float = None,
+            on_error: Callable[[Exception], Any] = None,
+    ):
+        assert 0 < batch_size <= capacity, "batch_size must > 0 and <= capacity"
+        self.batch_size = batch_size
+        self.interval = interval
+        self.capacity = capacity
+        self.timeout = timeout
+        self.on_error = on_error
+
+        self.sink: Optional[Callable[[List], Any]] = None
+        self._items: List = []
+        self._closed = False
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, sink: Callable[[List], Any]) -> None:
+        assert self.sink is None, "buffer has been attached"
+        self.sink = sink
+        self._start()
+        atexit.register(self.close)
+        _buffers.add(self)
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="RedisCooker:WriteBehind", daemon=True)
+        self._thread.start()
+
+    def _after_fork(self) -> None:
+        """items buffered by parent process are flushed by parent process"""
+        self._items = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed or self._start()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, *items: Any) -> None:
+        with self._condition:
+            if not self._condition.wait_for(lambda: len(self._items) < self.capacity, self.timeout):
+                raise queue.Full
+            self._items.extend(items)
+            len(self._items) >= self.batch_size and self._condition.notify_all()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._condition:
+                items, self._items = self._items, []
+                self._condition.notify_all()
+
+            if not items:
+                return
+
+            try:
+                self.sink(items)
+            except Exception:
+                with self._condition:
+                    self._items[:0] = items
+                raise
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread is not None and self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._items) >= self.batch_size or self._closed, self.interval)
+                if self._closed:
+                    return
+
+            try:
+                self.flush()
+            except Exception as e:
+                self.on_error and self.on_error(e)
+                time.sleep(self.interval)
+
+
+def _reset_after_fork() -> None:
+    for buffer in list(_buffers):
+        buffer._after_fork()
+
+
+hasattr(os, "register_at_fork") and os.register_at_fork(after_in_child=_reset_after_fork)
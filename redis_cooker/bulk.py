@@ -0,0 +1,147 @@
+import time
+import queue
+import threading
+from collections import abc, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from attr import dataclass
+
+from .clients import current_redis_client, connection_settings, apply_connection_settings
+from .collections import RedisDict, RedisList, RedisMutableSet
+from .mixins import RedisDataMixin, _batches
+
+__all__ = ["BulkLoadStats", "load"]
+
+
+@dataclass
+class BulkLoadStats:
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _command(target: RedisDataMixin) -> str:
+    """collections fake __class__, so type() is used instead of isinstance()"""
+    if issubclass(type(target), RedisList):
+        return "rpush"
+    if issubclass(type(target), RedisMutableSet):
+        return "sadd"
+    if issubclass(type(target), RedisDict):
+        assert target.nested is None, "bulk load into nested values is not supported, update the dict instead"
+        return "hset"
+    raise TypeError(f"bulk load into {type(target).__name__} is not supported")
+
+
+def _dump_batch(target: RedisDataMixin, batch: List) -> List:
+    if issubclass(type(target), RedisDict):
+        return [(k, target.dumps(v)) for k, v in batch]
+    return list(target.bulk_dumps(*batch))
+
+
+def _serialized_batches(target: RedisDataMixin, iterable: Iterable, batch_size: int, workers: int) -> Iterator[List]:
+    if not workers:
+        for batch in _batches(iterable, batch_size):
+            yield _dump_batch(target, batch)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=apply_connection_settings, initargs=(connection_settings(),)) as executor:
+        futures = deque()
+        for batch in _batches(iterable, batch_size):
+            futures.append(executor.submit(_dump_batch, target, batch))
+            if len(futures) >= workers * 2:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+
+class _Writer(threading.Thread):
+    def __init__(self, key: str, command: str, pending: queue.Queue, pipeline_depth: int, report: Callable):
+        super().__init__(name="RedisCooker:BulkLoad", daemon=True)
+        self.key = key
+        self.command = command
+        self.pending = pending
+        self.pipeline_depth = pipeline_depth
+        self.report = report
+        self.error: Optional[Exception] = None
+
+    def run(self) -> None:
+        pipeline = current_redis_client().pipeline(transaction=False)
+        rows = 0
+        while True:
+            batch = self.pending.get()
+            if self.error is not None:
+                if batch is None:
+                    return
+                continue
+
+            try:
+                if batch is not None:
+                    if self.command == "hset":
+                        pipeline.hset(self.key, mapping=dict(batch))
+                    else:
+                        getattr(pipeline, self.command)(self.key, *batch)
+                    rows += len(batch)
+
+                if batch is None or len(pipeline) >= self.pipeline_depth:
+                    pipeline.execute()
+                    self.report(rows)
+                    rows = 0
+            except Exception as e:
+                self.error = e
+
+            if batch is None:
+                return
+
+
+def load(
+        target: RedisDataMixin, iterable: Iterable, *, batch_size: int = 1000, workers: int = 0,
+        connections: int = 1, pipeline_depth: int = 8, progress: Callable[[BulkLoadStats], Any] = None,
+) -> BulkLoadStats:
+    """
+    stream iterable into target with flat memory:
+    batches are serialized by a pool of worker processes when workers > 0,
+    and written through pipelines of pipeline_depth batches on connections parallel connections.
+    RedisList is always written through one connection to keep the order.
+    """
+    command = _command(target)
+    if command == "rpush":
+        connections = 1
+    if isinstance(iterable, abc.Mapping):
+        iterable = iterable.items()
+
+    stats = BulkLoadStats()
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def report(rows: int) -> None:
+        with lock:
+            stats.rows += rows
+            stats.seconds = time.perf_counter() - start
+            progress and progress(stats)
+
+    pending = queue.Queue(maxsize=connections * pipeline_depth)
+    writers = [_Writer(target.key, command, pending, pipeline_depth, report) for _ in range(connections)]
+    for writer in writers:
+        writer.start()
+
+    try:
+        for batch in _serialized_batches(target, iterable, batch_size, workers):
+            if any(writer.error is not None for writer in writers):
+                break
+            pending.put(batch)
+    finally:
+        for _ in writers:
+            pending.put(None)
+        for writer in writers:
+            writer.join()
+
+    for writer in writers:
+        if writer.error is not None:
+            raise writer.error
+
+    stats.seconds = time.perf_counter() - start
+    return stats
@@ -0,0 +1,291 @@
+import math
+import time
+import random
+import struct
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from attr import dataclass
+from redis.client import Pipeline
+
+from .locks import RedisLock
+from .mixins import RedisDataMixin, _batches
+from .utils import escape_glob
+
+__all__ = ["CacheStats", "RedisCache"]
+
+_MISSING = object()
+_envelope = struct.Struct(">ddB")
+
+
+@dataclass
+class CacheStats:
+    local_hits: int = 0
+    remote_hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    computes: int = 0
+    early_refreshes: int = 0
+    waits: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        hits = self.local_hits + self.remote_hits + self.negative_hits
+        return hits / (hits + self.misses) if hits + self.misses else 0.0
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class RedisCache(RedisDataMixin):
+    """
+    an in-process LRU with local_ttl in front of redis, where every entry is a string key f"{key}:{field}" with ttl.
+    get_or_compute runs fn once per field at a time, in this process and across processes through a short lock.
+    Entries are refreshed early with probability growing as they approach expiry, weighted by how long fn took.
+    None results are cached for negative_ttl.
+    """
+    def __init__(
+            self, key: str = None, *, ttl: float = 300, local_ttl: float = 5, maxsize: int = 1024,
+            negative_ttl: float = 30, beta: float = 1.0, lock_timeout: float = 10, **kwargs: Any,
+    ):
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self.beta = beta
+        self.lock_timeout = lock_timeout
+        self.stats = CacheStats()
+        self._local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._mutex = threading.Lock()
+        super().__init__(key, **kwargs)
+
+    def _handle_options(self) -> Dict[str, Any]:
+        return {
+            **super()._handle_options(), "ttl": self.ttl, "local_ttl": self.local_ttl, "maxsize": self.maxsize,
+            "negative_ttl": self.negative_ttl, "beta": self.beta, "lock_timeout": self.lock_timeout,
+        }
+
+    def _entry_key(self, field: str) -> str:
+        return f"{self.key}:{field}"
+
+    def _get_local(self, field: str) -> Any:
+        with self._mutex:
+            entry = self._local.get(field)
+            if entry is None:
+                return _MISSING
+            if entry[0] < time.monotonic():
+                del self._local[field]
+                return _MISSING
+            self._local.move_to_end(field)
+            return entry[1]
+
+    def _set_local(self, field: str, value: Any) -> None:
+        with self._mutex:
+            self._local[field] = (time.monotonic() + self.local_ttl, value)
+            self._local.move_to_end(field)
+            len(self._local) > self.maxsize and self._local.popitem(last=False)
+
+    def _get_remote(self, field: str) -> Optional[Tuple[Any, float, float]]:
+        """value, seconds fn took and expiry in unix time"""
+        data = self.redis.get(self._entry_key(field))
+        if data is None:
+            return None
+
+        delta, expiry, negative = _envelope.unpack_from(data)
+        value = None if negative else self.loads(memoryview(data)[_envelope.size:])
+        return value, delta, expiry
+
+    def _set_remote(self, field: str, value: Any, delta: float, ttl: float = None, nx: bool = False) -> None:
+        ttl = (self.ttl if value is not None else self.negative_ttl) if ttl is None else ttl
+        header = _envelope.pack(delta, time.time() + ttl, value is None)
+        self.redis.set(self._entry_key(field), header + self._payload(value), px=max(1, int(ttl * 1000)), nx=nx)
+
+    def _payload(self, value: Any) -> bytes:
+        payload = b"" if value is None else self.dumps(value)
+        return payload.encode("utf-8") if isinstance(payload, str) else bytes(payload)
+
+    def _should_refresh(self, delta: float, expiry: float) -> bool:
+        """XFetch: recompute before expiry with probability growing as expiry and the cost of fn get closer"""
+        return time.time() - delta * self.beta * math.log(1 - random.random()) >= expiry
+
+    def _count(self, value: Any, remote: bool) -> None:
+        if value is None:
+            self.stats.negative_hits += 1
+        elif remote:
+            self.stats.remote_hits += 1
+        else:
+            self.stats.local_hits += 1
+
+    def get_or_compute(self, field: str, fn: Callable[[], Any], ttl: float = None) -> Any:
+        value = self._get_local(field)
+        if value is not _MISSING:
+            self._count(value, remote=False)
+            return value
+
+        entry = self._get_remote(field)
+        if entry is not None:
+            value, delta, expiry = entry
+            self._count(value, remote=True)
+            if not self._should_refresh(delta, expiry):
+                self._set_local(field, value)
+                return value
+            self.stats.early_refreshes += 1
+            return self._single_flight(field, fn, ttl, stale=value)
+
+        self.stats.misses += 1
+        return self._single_flight(field, fn, ttl, stale=_MISSING)
+
+    def _single_flight(self, field: str, fn: Callable[[], Any], ttl: Optional[float], stale: Any) -> Any:
+        with self._mutex:
+            flight = self._flights.get(field)
+            leader = flight is None
+            if leader:
+                flight = self._flights[field] = _Flight()
+
+        if not leader:
+            if stale is not _MISSING:
+                return stale
+            self.stats.waits += 1
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._compute(field, fn, ttl, stale)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._mutex:
+                del self._flights[field]
+            flight.done.set()
+
+    def _compute(self, field: str, fn: Callable[[], Any], ttl: Optional[float], stale: Any) -> Any:
+        lock = RedisLock(self._entry_key(field), timeout=self.lock_timeout, blocking=False)
+        if not lock.acquire():
+            if stale is not _MISSING:
+                return stale
+            entry = self._wait_remote(field)
+            if entry is not None:
+                self.stats.waits += 1
+                self._set_local(field, entry[0])
+                return entry[0]
+
+        try:
+            start = time.perf_counter()
+            value = fn()
+            self.stats.computes += 1
+            self._set_remote(field, value, time.perf_counter() - start, ttl)
+            self._set_local(field, value)
+            return value
+        finally:
+            lock.token is not None and lock.release()
+
+    def _wait_remote(self, field: str) -> Optional[Tuple[Any, float, float]]:
+        """another process computes field, poll for its result until the lock would expire"""
+        deadline = time.monotonic() + self.lock_timeout
+        backoff = 0.001
+        while time.monotonic() < deadline:
+            time.sleep(backoff)
+            entry = self._get_remote(field)
+            if entry is not None:
+                return entry
+            backoff = min(backoff * 2, 0.1)
+        return None
+
+    def __getitem__(self, field: str) -> Any:
+        value = self._get_local(field)
+        if value is not _MISSING:
+            self._count(value, remote=False)
+            return value
+
+        entry = self._get_remote(field)
+        if entry is None:
+            self.stats.misses += 1
+            _ = {}[field]
+        self._count(entry[0], remote=True)
+        self._set_local(field, entry[0])
+        return entry[0]
+
+    def set(self, field: str, value: Any, ttl: float = None) -> None:
+        self._set_remote(field, value, 0.0, ttl)
+        self._set_local(field, value)
+
+    def __setitem__(self, field: str, value: Any) -> None:
+        self.set(field, value)
+
+    def __delitem__(self, field: str) -> None:
+        self.invalidate(field)
+
+    def __contains__(self, field: str) -> bool:
+        return self._get_local(field) is not _MISSING or bool(self.reader.exists(self._entry_key(field)))
+
+    def invalidate(self, field: str) -> None:
+        """drop field from redis and from this process, other processes keep it for local_ttl at most"""
+        with self._mutex:
+            self._local.pop(field, None)
+        self.redis.delete(self._entry_key(field))
+
+    def _entry_keys(self) -> Iterator[List[bytes]]:
+        pattern = escape_glob(self.key) + ":*"
+        return _batches(self.redis.scan_iter(match=pattern, count=self.dump_chunk_size), self.dump_chunk_size)
+
+    def _init(self, init: Dict[str, Any]) -> None:
+        """fields of init are set unless they exist, there is no key to tell whether the cache is new"""
+        for field, value in init.items():
+            self._set_remote(field, value, 0.0, nx=True)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        exc_type is not None and self.init and self.clear()
+        return super().__exit__(exc_type, exc_val, exc_tb)
+
+    def clear(self) -> None:
+        with self._mutex:
+            self._local.clear()
+        for keys in self._entry_keys():
+            self.redis.delete(*keys)
+        self._forget_initialized_key()
+
+    def rename(self, new: str) -> None:
+        """entries are copied with their remaining ttl, they may live in other slots than the new ones"""
+        prefix = len(self._entry_key("").encode("utf-8"))
+        for keys in self._entry_keys():
+            with self.redis.pipeline(transaction=False) as pipeline:
+                for k in keys:
+                    pipeline.get(k)
+                    pipeline.pttl(k)
+                response = pipeline.execute()
+            with self.redis.pipeline(transaction=False) as pipeline:
+                for k, value, ttl in zip(keys, response[::2], response[1::2]):
+                    value is not None and ttl > 0 and pipeline.set(f"{new}:{k[prefix:].decode('utf-8')}", value, px=ttl)
+                    pipeline.delete(k)
+                pipeline.execute()
+        self._forget_initialized_key()
+        self.key = new
+
+    _record_width = 2
+
+    def _dump_records(self) -> Iterator[bytes]:
+        """field and envelope pairs, the envelope carries the expiry of its entry"""
+        prefix = len(self._entry_key("").encode("utf-8"))
+        for keys in self._entry_keys():
+            for k, v in zip(keys, self.redis.mget(keys)):
+                if v is not None:
+                    yield k[prefix:]
+                    yield v
+
+    def _load_batch(self, pipeline: Pipeline, records: List[bytes]) -> None:
+        now = time.time()
+        for field, data in zip(records[::2], records[1::2]):
+            _, expiry, _ = _envelope.unpack_from(data)
+            ttl = int((expiry - now) * 1000)
+            ttl > 0 and pipeline.set(self._entry_key(bytes(field).decode("utf-8")), data, px=ttl)
+
@@ -1,31 +1,122 @@
+import os
+import enum
+import random
 import threading
-from typing import Optional
+from typing import Optional, Union, List, Tuple, Any
 
 from redis.client import Redis
+from redis.cluster import RedisCluster
+from redis.sentinel import Sentinel
 
-__all__ = ["set_connection_url", "current_redis_client"]
+__all__ = [
+    "ReadPolicy", "set_connection_url", "set_replica_urls", "set_sentinel", "set_read_policy",
+    "current_redis_client", "connection_settings", "apply_connection_settings",
+]
 
 _connection_url: Optional[str] = None
+_cluster: bool = False
+_replica_urls: List[str] = []
+_sentinel: Optional[Sentinel] = None
+_service_name: Optional[str] = None
+_sentinel_args: Optional[Tuple] = None
+
+
+class ReadPolicy(str, enum.Enum):
+    PRIMARY = "primary"
+    REPLICA = "replica"
+
+
+_read_policy: ReadPolicy = ReadPolicy.PRIMARY
 
 
 class _RedisClients(threading.local):
-    current_client: Optional[Redis] = None
+    current_client: Optional[Union[Redis, RedisCluster]] = None
+    replica_client: Optional[Union[Redis, RedisCluster]] = None
 
 
 _redis_clients = _RedisClients()
 
 
-def set_connection_url(connection_url: str) -> None:
-    global _connection_url
+def _reset_after_fork() -> None:
+    """clients inherited from parent process share its sockets, so child process must create its own"""
+    global _redis_clients
+    _redis_clients = _RedisClients()
+
+
+hasattr(os, "register_at_fork") and os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def set_connection_url(connection_url: str, *, cluster: bool = False) -> None:
+    global _connection_url, _cluster
     _connection_url = connection_url
+    _cluster = cluster
+
+
+def set_replica_urls(*replica_urls: str) -> None:
+    global _replica_urls
+    _replica_urls = list(replica_urls)
+    _redis_clients.replica_client = None
+
+
+def set_sentinel(sentinels: List[Tuple[str, int]], service_name: str, **kwargs: Any) -> None:
+    """primary and replicas are discovered by sentinel instead of connection url"""
+    global _sentinel, _service_name, _sentinel_args
+    _sentinel = Sentinel(sentinels, **kwargs)
+    _service_name = service_name
+    _sentinel_args = (sentinels, service_name, kwargs)
+    _redis_clients.current_client = _redis_clients.replica_client = None
+
+
+def set_read_policy(policy: ReadPolicy) -> None:
+    global _read_policy
+    _read_policy = ReadPolicy(policy)
+
+
+def connection_settings() -> Tuple:
+    """picklable settings of this process, for workers that do not inherit them, such as spawned processes"""
+    return _connection_url, _cluster, _replica_urls, _sentinel_args, _read_policy
+
+
+def apply_connection_settings(settings: Tuple) -> None:
+    """Pool(initializer=apply_connection_settings, initargs=(connection_settings(),))"""
+    connection_url, cluster, replica_urls, sentinel_args, read_policy = settings
+    connection_url is not None and set_connection_url(connection_url, cluster=cluster)
+    set_replica_urls(*replica_urls)
+    sentinel_args is not None and set_sentinel(*sentinel_args[:2], **sentinel_args[2])
+    set_read_policy(read_policy)
+
+
+def _create_primary_client() -> Union[Redis, RedisCluster]:
+    if _sentinel is not None:
+        return _sentinel.master_for(_service_name)
+
+    assert _connection_url is not None, "please set connection string first"
+    return (RedisCluster if _cluster else Redis).from_url(_connection_url)
+
+
+def _create_replica_client() -> Union[Redis, RedisCluster]:
+    if _sentinel is not None:
+        return _sentinel.slave_for(_service_name)
+
+    if _cluster:
+        return RedisCluster.from_url(_connection_url, read_from_replicas=True)
+
+    if _replica_urls:
+        return Redis.from_url(random.choice(_replica_urls))
+
+    return current_redis_client()
+
 
+def current_redis_client(read_only: bool = False) -> Union[Redis, RedisCluster]:
+    if read_only and _read_policy is ReadPolicy.REPLICA:
+        client = _redis_clients.replica_client
+        if client is None:
+            client = _redis_clients.replica_client = _create_replica_client()
+        return client
 
-def current_redis_client() -> Redis:
     client = _redis_clients.current_client
 
     if client is None:
-        assert _connection_url is not None, "please set connection string first"
-        client = Redis.from_url(_connection_url)
-        _redis_clients.current_client = client
+        client = _redis_clients.current_client = _create_primary_client()
 
     return client
@@ -1,17 +1,38 @@
+import re
+import sys
+import json
+import math
+import time
+import heapq
+import hashlib
+import random
+import operator
 import itertools
 from collections import abc, UserString, UserList, UserDict, deque, defaultdict
-from typing import List, Dict, Set, Any, Callable
+from typing import List, Dict, Set, Any, Callable, Optional, Tuple, Iterator, Union, Iterable
 
-from redis.exceptions import ResponseError
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from redis.client import Pipeline
+from redis.exceptions import ResponseError, WatchError
 
 from .atomic import run_as_lua
-from .mixins import RedisDataMixin
-from .utils import temporary_key
+from .adapters import BytesLike
+from .mixins import RedisDataMixin, RedisScanMixin, _batches, _iter_records, _pack_records
+from .utils import temporary_key, same_slot
+
+__all__ = [
+    "RedisMutableSet", "RedisString", "RedisList", "RedisDict", "RedisDeque", "RedisDefaultDict",
+    "RedisHyperLogLog", "RedisBloomFilter", "RedisBitmap",
+]
 
-__all__ = ["RedisMutableSet", "RedisString", "RedisList", "RedisDict", "RedisDeque", "RedisDefaultDict"]
 
+class RedisMutableSet(RedisDataMixin, RedisScanMixin, abc.MutableSet):
+    _write_behind_command = "sadd"
 
-class RedisMutableSet(RedisDataMixin, abc.MutableSet):
     @run_as_lua(lambda self, init: list(self.bulk_dumps(*init)))
     def _init(self, init: Set) -> None:
         """
@@ -24,29 +45,44 @@ class RedisMutableSet(RedisDataMixin, abc.MutableSet):
         pass
 
     def __len__(self) -> int:
-        return self.redis.scard(self.key)
+        return self.reader.scard(self.key)
 
     def __iter__(self):
-        for i in self.redis.sscan_iter(self.key):
-            yield self.loads(i)
+        yield from self.scan()
 
     def __contains__(self, item) -> bool:
-        return self.redis.sismember(self.key, self.dumps(item))
+        return self.reader.sismember(self.key, self.dumps(item))
 
     def add(self, element) -> None:
-        self.redis.sadd(self.key, self.dumps(element))
+        if self.buffer is not None:
+            self.buffer.put(self.dumps(element))
+        else:
+            self.redis.sadd(self.key, self.dumps(element))
 
     def discard(self, element) -> None:
         self.redis.srem(self.key, self.dumps(element))
 
     def clear(self) -> None:
         self.redis.delete(self.key)
+        self._forget_initialized_key()
+
+    def _dump_records(self) -> Iterator[bytes]:
+        yield from self.redis.sscan_iter(self.key, count=self.dump_chunk_size)
+
+    def _load_batch(self, pipeline: Pipeline, records: List[bytes]) -> None:
+        pipeline.sadd(self.key, *records)
+
+    def _scan_batch(self, cursor: int, match: Optional[str], count: int) -> Tuple[int, List[bytes]]:
+        return self.reader.sscan(self.key, cursor, match, count)
 
     def bulk_discard(self, *element) -> int:
         return self.redis.srem(self.key, *self.bulk_dumps(*element))
 
     def update(self, *element) -> None:
-        self.redis.sadd(self.key, *self.bulk_dumps(*element))
+        if self.buffer is not None:
+            self.buffer.put(*self.bulk_dumps(*element))
+        else:
+            self.redis.sadd(self.key, *self.bulk_dumps(*element))
 
     def __str__(self) -> str:
         return "{" + ", ".join(str(i) for i in self) + "}"
@@ -58,23 +94,26 @@ class RedisMutableSet(RedisDataMixin, abc.MutableSet):
     def _from_iterable(cls, it) -> Set:
         return set(it)
 
+    def _colocated(self, other) -> bool:
+        return isinstance(other, type(self)) and same_slot(self.redis, self.key, other.key)
+
     def __isub__(self, other) -> "RedisMutableSet":
-        if isinstance(other, type(self)):
+        if self._colocated(other):
             self.redis.sdiffstore(self.key, [self.key, other.key])
         else:
             self.bulk_discard(*other)
         return self
 
     def __ior__(self, other) -> "RedisMutableSet":
-        if isinstance(other, type(self)):
+        if self._colocated(other):
             self.redis.sunionstore(self.key, [self.key, other.key])
         else:
             self.update(*other)
         return self
 
     def __ixor__(self, other) -> "RedisMutableSet":
-        if isinstance(other, type(self)):
-            temp_key1, temp_key2 = temporary_key(), temporary_key()
+        if self._colocated(other):
+            temp_key1, temp_key2 = temporary_key(self.key), temporary_key(self.key)
             with self.redis.pipeline() as pipe:
                 pipe.sdiffstore(temp_key1, [self.key, other.key])
                 pipe.sdiffstore(temp_key2, [other.key, self.key])
@@ -83,7 +122,7 @@ class RedisMutableSet(RedisDataMixin, abc.MutableSet):
                 pipe.delete(temp_key2)
                 pipe.execute()
         else:
-            temp_key1, temp_key2, temp_key3 = temporary_key(), temporary_key(), temporary_key()
+            temp_key1, temp_key2, temp_key3 = temporary_key(self.key), temporary_key(self.key), temporary_key(self.key)
             with self.redis.pipeline() as pipe:
                 pipe.sadd(temp_key1, *self.bulk_dumps(*other))
                 pipe.sdiffstore(temp_key2, [self.key, temp_key1])
@@ -96,10 +135,10 @@ class RedisMutableSet(RedisDataMixin, abc.MutableSet):
         return self
 
     def __iand__(self, other) -> "RedisMutableSet":
-        if isinstance(other, type(self)):
+        if self._colocated(other):
             self.redis.sinterstore(self.key, [self.key, other.key])
         else:
-            temp_key = temporary_key()
+            temp_key = temporary_key(self.key)
             with self.redis.pipeline() as pipe:
                 pipe.sadd(temp_key, *self.bulk_dumps(*other))
                 pipe.sinterstore(self.key, [self.key, temp_key])
@@ -108,7 +147,18 @@ class RedisMutableSet(RedisDataMixin, abc.MutableSet):
         return self
 
 
-class RedisString(RedisDataMixin, UserString):
+class _StringRecords:
+    """dump and load of collections stored as one plain redis string"""
+    def _dump_records(self) -> Iterator[bytes]:
+        value = self.redis.get(self.key)
+        if value is not None:
+            yield value
+
+    def _load_batch(self, pipeline: Pipeline, records: List[bytes]) -> None:
+        pipeline.set(self.key, records[-1])
+
+
+class RedisString(_StringRecords, RedisDataMixin, UserString):
     __class__ = str
 
     def _init(self, init: str) -> None:
@@ -116,11 +166,24 @@ class RedisString(RedisDataMixin, UserString):
 
     @property
     def data(self) -> str:
-        return (self.redis.get(self.key) or b"").decode("utf-8")
+        return self.raw_data.decode("utf-8")
+
+    @property
+    def raw_data(self) -> bytes:
+        return self.reader.get(self.key) or b""
+
+    def __bytes__(self) -> bytes:
+        return self.raw_data
+
+
+def _slice_arguments(index: slice) -> List:
+    return ["" if i is None else i for i in (index.start, index.stop)] + [1 if index.step is None else index.step]
 
 
 class RedisList(RedisDataMixin, UserList):
     __class__ = list
+    _write_behind_command = "rpush"
+    sort_chunk_size: int = 10000
 
     @run_as_lua(lambda self, init: list(self.bulk_dumps(*init)))
     def _init(self, init: List) -> None:
@@ -134,15 +197,27 @@ class RedisList(RedisDataMixin, UserList):
         pass
 
     def __iter__(self):
-        for i in self.redis.lrange(self.key, 0, -1):
-            yield self.loads(i)
+        yield from self.bulk_loads(*self.reader.lrange(self.key, 0, -1))
 
     @property
     def data(self) -> List:
         return list(self)
 
+    def _dump_records(self) -> Iterator[bytes]:
+        for start in itertools.count(0, self.dump_chunk_size):
+            records = self.redis.lrange(self.key, start, start + self.dump_chunk_size - 1)
+            yield from records
+            if len(records) < self.dump_chunk_size:
+                return
+
+    def _load_batch(self, pipeline: Pipeline, records: List[bytes]) -> None:
+        pipeline.rpush(self.key, *records)
+
     def extend(self, other) -> None:
-        self.redis.rpush(self.key, *self.bulk_dumps(*other))
+        if self.buffer is not None:
+            self.buffer.put(*self.bulk_dumps(*other))
+        else:
+            self.redis.rpush(self.key, *self.bulk_dumps(*other))
 
     def __iadd__(self, other) -> "RedisList":
         self.extend(other)
@@ -155,49 +230,52 @@ class RedisList(RedisDataMixin, UserList):
     def append(self, item) -> None:
         self.extend([item])
 
-    @run_as_lua(lambda self, index, item: [index if index >= 0 else index - 1, item])
-    def _redis_insert(self, index: int, item: str) -> None:
-        """
-        local input_index = tonumber(ARGV[1])
-        local new_index = nil
-        local where = nil
-        if input_index < 0
-        then
-            where = "AFTER"
-            new_index = input_index - 1
-        else
-            where = "BEFORE"
-            new_index = input_index + 1
-        end
-        local target = redis.call("LINDEX", KEYS[1], input_index)
-        local replace_mark = "__REPLACE_MARK__"
-        redis.call("LSET", KEYS[1], input_index, replace_mark)
-
-        redis.call("LINSERT", KEYS[1], where, replace_mark, ARGV[2])
-        redis.call("LSET", KEYS[1], new_index, target)
-        """
-        pass
-
     def insert(self, index: int, item: str) -> None:
+        """list.insert(index, item) is list[index:index] = [item], so it shares the slice script"""
         if index == 0:
             self.redis.lpush(self.key, self.dumps(item))
         else:
-            self._redis_insert(index, self.dumps(item))
+            self._redis__setitem__(slice(index, index), [item])
 
     @run_as_lua(lambda self, index: [index])
     def _redis_pop(self, index: int) -> bytes:
         """
-        local index = ARGV[1]
-        if index == "-1"
-        then
-            index = redis.call("LLEN", KEYS[1]) - 1
+        local length = redis.call("LLEN", KEYS[1])
+        local index = tonumber(ARGV[1])
+        if index < 0 then
+            index = length + index
+        end
+        if index < 0 or index >= length then
+            return false
         end
 
-        local temp = redis.call("LINDEX", KEYS[1], index)
-        local deleted_mark = "_DELETED_MARK_"
-        redis.call("LSET", KEYS[1], index, deleted_mark)
-        redis.call("LREM", KEYS[1], 0, deleted_mark)
-        return temp
+        local target = redis.call("LINDEX", KEYS[1], index)
+        local items = {}
+        if index < length - index - 1 then
+            if index > 0 then
+                items = redis.call("LRANGE", KEYS[1], 0, index - 1)
+            end
+            redis.call("LTRIM", KEYS[1], index + 1, -1)
+            local reversed = {}
+            for i = #items, 1, -1 do
+                reversed[#reversed + 1] = items[i]
+            end
+            items = reversed
+            for i = 1, #items, 1000 do
+                redis.call("LPUSH", KEYS[1], unpack(items, i, math.min(i + 999, #items)))
+            end
+        else
+            items = redis.call("LRANGE", KEYS[1], index + 1, -1)
+            if index > 0 then
+                redis.call("LTRIM", KEYS[1], 0, index - 1)
+            else
+                redis.call("DEL", KEYS[1])
+            end
+            for i = 1, #items, 1000 do
+                redis.call("RPUSH", KEYS[1], unpack(items, i, math.min(i + 999, #items)))
+            end
+        end
+        return target
         """
         pass
 
@@ -209,13 +287,70 @@ class RedisList(RedisDataMixin, UserList):
         else:
             element = self._redis_pop(index)
 
+        if element is None:
+            [].pop()
+
         return self.loads(element)
 
     def remove(self, item) -> None:
-        self.redis.lrem(self.key, 1, self.dumps(item))
+        if self.redis.lrem(self.key, 1, self.dumps(item)) == 0:
+            [].remove(item)
+
+    @run_as_lua(lambda self, item, start, stop: [item, start, stop])
+    def _redis_index(self, item: str, start: int, stop: int) -> int:
+        """
+        local length = redis.call("LLEN", KEYS[1])
+        local function convert(data)
+            if data < 0 then
+                data = math.max(length + data, 0)
+            end
+            return math.min(data, length)
+        end
+        local start = convert(tonumber(ARGV[2]))
+        local stop = convert(tonumber(ARGV[3]))
+        if start >= stop then
+            return -1
+        end
+
+        local batch = 100
+        local rank = 1
+        while true do
+            local positions = redis.call("LPOS", KEYS[1], ARGV[1], "RANK", rank, "COUNT", batch, "MAXLEN", stop)
+            for _, position in ipairs(positions) do
+                if position >= start then
+                    return position
+                end
+            end
+            if #positions < batch then
+                return -1
+            end
+            rank = rank + batch
+        end
+        """
+        pass
+
+    def index(self, item, start: int = 0, stop: int = sys.maxsize) -> int:
+        position = self._redis_index(self.dumps(item), start, stop)
+        if position < 0:
+            raise ValueError(f"{item!r} is not in list")
+        return position
+
+    @run_as_lua(lambda self, item: [item])
+    def _redis_count(self, item: str) -> int:
+        """
+        return #redis.call("LPOS", KEYS[1], ARGV[1], "COUNT", 0)
+        """
+        pass
+
+    def count(self, item) -> int:
+        return self._redis_count(self.dumps(item))
+
+    def __contains__(self, item) -> bool:
+        return self.reader.lpos(self.key, self.dumps(item)) is not None
 
     def clear(self) -> None:
         self.redis.delete(self.key)
+        self._forget_initialized_key()
 
     @run_as_lua(lambda self: [])
     def reverse(self) -> None:
@@ -233,66 +368,144 @@ class RedisList(RedisDataMixin, UserList):
         """
         pass
 
-    def sort(self, reverse=False) -> None:
-        self.redis.sort(self.key, desc=reverse, alpha=True, store=self.key)
-
-    @run_as_lua(lambda self, index, value: [index.start or 0, index.stop or -1, index.step or 1, *self.bulk_dumps(*value)])
+    def sort(self, *, key: Callable = None, reverse: bool = False) -> None:
+        if key is None:
+            try:
+                self.redis.sort(self.key, desc=reverse, store=self.key)
+                return
+            except ResponseError:
+                pass
+
+        self._merge_sort(key, reverse)
+
+    def _sorted_run(self, raws: List[bytes], key: Optional[Callable], reverse: bool) -> List[Tuple[Any, bytes]]:
+        values = self.bulk_loads(*raws)
+        return sorted(zip(map(key, values) if key else values, raws), key=operator.itemgetter(0), reverse=reverse)
+
+    def _iter_run(self, run: str, chunk_size: int, key: Optional[Callable]):
+        for start in itertools.count(0, chunk_size):
+            raws = self.redis.lrange(run, start, start + chunk_size - 1)
+            yield from zip(map(key, self.bulk_loads(*raws)) if key else self.bulk_loads(*raws), raws)
+            if len(raws) < chunk_size:
+                return
+
+    def _merge_sort(self, key: Optional[Callable], reverse: bool) -> None:
+        """external merge sort, at most sort_chunk_size elements are held in memory"""
+        length, chunk_size = self.redis.llen(self.key), self.sort_chunk_size
+        runs = []
+        output = temporary_key(self.key)
+        try:
+            for start in range(0, length, chunk_size):
+                run = temporary_key(self.key)
+                runs.append(run)
+                pairs = self._sorted_run(self.redis.lrange(self.key, start, start + chunk_size - 1), key, reverse)
+                self.redis.rpush(run, *(raw for _, raw in pairs))
+
+            if not runs:
+                return
+
+            run_chunk_size = max(chunk_size // len(runs), 1)
+            merged = heapq.merge(
+                *(self._iter_run(i, run_chunk_size, key) for i in runs), key=operator.itemgetter(0), reverse=reverse
+            )
+            while True:
+                raws = [raw for _, raw in itertools.islice(merged, chunk_size)]
+                if not raws:
+                    break
+                self.redis.rpush(output, *raws)
+
+            self.redis.rename(output, self.key)
+        finally:
+            self.redis.delete(output, *runs)
+
+    @run_as_lua(lambda self, index, value: [*_slice_arguments(index), *self.bulk_dumps(*value)])
     def _redis__setitem__(self, index, value) -> None:
         """
         local length = redis.call("LLEN", KEYS[1])
-        local function convert(data)
-            if data >= 0 then
-                return data
-            else
-                return length + data
+        local step = tonumber(ARGV[3])
+        local lower, upper = 0, length
+        if step < 0 then
+            lower, upper = -1, length - 1
+        end
+        local function clamp(data, default)
+            if data == "" then
+                return default
             end
+            data = tonumber(data)
+            if data < 0 then
+                return math.max(data + length, lower)
+            end
+            return math.min(data, upper)
         end
-        local start = convert(tonumber(ARGV[1]))
-        local stop = math.min(length, convert(tonumber(ARGV[2])))
-        local step = tonumber(ARGV[3])
+        local start = clamp(ARGV[1], step < 0 and upper or lower)
+        local stop = clamp(ARGV[2], step < 0 and lower or upper)
 
-        if step > 1 then
-            local size = math.floor((stop - start + 1) / step)
-            local extended = #ARGV - 3
-            if size < extended then
-                error(string.format("attempt to assign sequence of size %d to extended slice of size %d", size, extended))
+        local function push(command, items)
+            for i = 1, #items, 1000 do
+                redis.call(command, KEYS[1], unpack(items, i, math.min(i + 999, #items)))
             end
         end
 
-        local temp_start = start
-        local count = 4
-
-        local placeholder = "__PLACEHOLDER__"
-        local append = {}
-        local temp_placeholder = 1
-        while (temp_placeholder <= #ARGV) do
-            table.insert(append, placeholder)
-            temp_placeholder = temp_placeholder + 1
+        local values = {}
+        for i = 4, #ARGV do
+            values[#values + 1] = ARGV[i]
         end
 
-        redis.call("RPUSH", KEYS[1], unpack(append))
-        while (temp_start < stop) do
-            redis.call("LSET", KEYS[1], temp_start, ARGV[count] or placeholder)
-            count = count + 1
-            temp_start = temp_start + step
+        if step ~= 1 then
+            local size = 0
+            if step > 0 and stop > start then
+                size = math.floor((stop - start - 1) / step) + 1
+            elseif step < 0 and start > stop then
+                size = math.floor((start - stop - 1) / -step) + 1
+            end
+            if size ~= #values then
+                error(string.format("attempt to assign sequence of size %d to extended slice of size %d", #values, size))
+            end
+            for i, value in ipairs(values) do
+                redis.call("LSET", KEYS[1], start + (i - 1) * step, value)
+            end
+            return
         end
 
-        local pointer = "__POINTER__"
-        temp_start = temp_start - step
-        while (count <= #ARGV) do
-            redis.call("LSET", KEYS[1], temp_start, pointer)
-            redis.call("LINSERT", KEYS[1], "AFTER", pointer, ARGV[count])
-            redis.call("LSET", KEYS[1], temp_start, ARGV[count - 1])
-            count = count + 1
-            temp_start = temp_start + 1
+        stop = math.max(start, stop)
+        if stop - start == #values then
+            for i, value in ipairs(values) do
+                redis.call("LSET", KEYS[1], start + i - 1, value)
+            end
+        elseif start <= length - stop then
+            local items = {}
+            if start > 0 then
+                items = redis.call("LRANGE", KEYS[1], 0, start - 1)
+            end
+            for _, value in ipairs(values) do
+                items[#items + 1] = value
+            end
+            redis.call("LTRIM", KEYS[1], stop, -1)
+            local reversed = {}
+            for i = #items, 1, -1 do
+                reversed[#reversed + 1] = items[i]
+            end
+            push("LPUSH", reversed)
+        else
+            local tail = redis.call("LRANGE", KEYS[1], stop, -1)
+            if start > 0 then
+                redis.call("LTRIM", KEYS[1], 0, start - 1)
+            else
+                redis.call("DEL", KEYS[1])
+            end
+            for _, value in ipairs(tail) do
+                values[#values + 1] = value
+            end
+            push("RPUSH", values)
         end
-
-        redis.call("LREM", KEYS[1], 2 * #ARGV, placeholder)
-        redis.call("LREM", KEYS[1], 1, pointer)
         """
         pass
 
     def __setitem__(self, index, value) -> None:
+        """
+        one script, atomic: equal sized and extended slices are LSET in place, other slices move every element
+        between the slice and the nearer end of the list, O(min(start, len - stop)) inside the script
+        """
         if isinstance(index, slice) and not isinstance(value, abc.Iterable):
             [][index] = value
 
@@ -304,77 +517,145 @@ class RedisList(RedisDataMixin, UserList):
                     _ = [][0]
                 raise
         else:
+            index.step == 0 and [][index]
             try:
                 self._redis__setitem__(index, value)
             except ResponseError as e:
-                msg = str(e)
-                if "attempt to assign sequence of size " in msg:
-                    raise ValueError(msg.split(": ")[-1])
+                matched = re.search(r"attempt to assign sequence of size \d+ to extended slice of size \d+", str(e))
+                if matched:
+                    raise ValueError(matched.group())
                 raise
 
-    @run_as_lua(lambda self, index: [index.start or 0, index.stop or -1, index.step or 1])
+    @run_as_lua(lambda self, index: _slice_arguments(index))
     def _redis__delitem__(self, index) -> None:
         """
-        local placeholder = "__PLACEHOLDER__"
         local length = redis.call("LLEN", KEYS[1])
-        local function convert(data)
-            if data >= 0 then
-                return data
-            else
-                return length + data
+        local step = tonumber(ARGV[3])
+        local lower, upper = 0, length
+        if step < 0 then
+            lower, upper = -1, length - 1
+        end
+        local function clamp(data, default)
+            if data == "" then
+                return default
+            end
+            data = tonumber(data)
+            if data < 0 then
+                return math.max(data + length, lower)
             end
+            return math.min(data, upper)
         end
-        local start = convert(tonumber(ARGV[1]))
-        local stop = math.min(length, convert(tonumber(ARGV[2])))
-        local step = tonumber(ARGV[3])
-        local temp_start = start
-        local count = 0
-        while (temp_start < stop) do
-            redis.call("LSET", KEYS[1], temp_start, placeholder)
-            count = count + 1
-            temp_start = temp_start + step
+        local start = clamp(ARGV[1], step < 0 and upper or lower)
+        local stop = clamp(ARGV[2], step < 0 and lower or upper)
+
+        local size = 0
+        if step > 0 and stop > start then
+            size = math.floor((stop - start - 1) / step) + 1
+        elseif step < 0 and start > stop then
+            size = math.floor((start - stop - 1) / -step) + 1
+        end
+        if size == 0 then
+            return
+        end
+
+        local lo, hi = start, start + (size - 1) * step
+        if step < 0 then
+            lo, hi = hi, lo
+        end
+        local kept = {}
+        if math.abs(step) > 1 then
+            for i, value in ipairs(redis.call("LRANGE", KEYS[1], lo, hi)) do
+                if (lo + i - 1 - start) % step ~= 0 then
+                    kept[#kept + 1] = value
+                end
+            end
+        end
+
+        local function push(command, items)
+            for i = 1, #items, 1000 do
+                redis.call(command, KEYS[1], unpack(items, i, math.min(i + 999, #items)))
+            end
+        end
+
+        if lo <= length - hi - 1 then
+            local items = {}
+            if lo > 0 then
+                items = redis.call("LRANGE", KEYS[1], 0, lo - 1)
+            end
+            for _, value in ipairs(kept) do
+                items[#items + 1] = value
+            end
+            redis.call("LTRIM", KEYS[1], hi + 1, -1)
+            local reversed = {}
+            for i = #items, 1, -1 do
+                reversed[#reversed + 1] = items[i]
+            end
+            push("LPUSH", reversed)
+        else
+            local tail = redis.call("LRANGE", KEYS[1], hi + 1, -1)
+            if lo > 0 then
+                redis.call("LTRIM", KEYS[1], 0, lo - 1)
+            else
+                redis.call("DEL", KEYS[1])
+            end
+            for _, value in ipairs(tail) do
+                kept[#kept + 1] = value
+            end
+            push("RPUSH", kept)
         end
-        redis.call("LREM", KEYS[1], count, placeholder)
         """
         pass
 
     def __delitem__(self, index) -> None:
+        """like slice assignment, elements between the slice and the nearer end of the list are moved in one script"""
         if not isinstance(index, slice):
             try:
                 self.pop(index)
-            except TypeError as e:
-                if "the JSON object must be str, bytes or bytearray, not" in str(e):
-                    del [][index]
-                raise
-            except ResponseError as e:
-                if "ERR index out of range" in str(e):
-                    del [][index]
-                raise
+            except IndexError:
+                del [][index]
         else:
+            index.step == 0 and [][index]
             self._redis__delitem__(index)
 
     def __len__(self) -> int:
-        return self.redis.llen(self.key)
+        return self.reader.llen(self.key)
 
     def __getitem__(self, index) -> Any:
         if not isinstance(index, slice):
-            return self.loads(self.redis.lrange(self.key, index, index)[0])
+            return self.loads(self.reader.lrange(self.key, index, index)[0])
 
         if index.start is None and index.stop is None:
             return self.data
 
         start, stop = index.start or 0, (index.stop or 0) - 1
-        return list(self.bulk_loads(*self.redis.lrange(self.key, start, stop)))
+        return list(self.bulk_loads(*self.reader.lrange(self.key, start, stop)))
 
 
-class RedisDict(RedisDataMixin, UserDict):
+class RedisDict(RedisDataMixin, RedisScanMixin, UserDict):
+    """
+    nested=RedisList (or any other collection) stores every value as a child collection under f"{key}:{field}",
+    values are returned as lazy handles of the child keys and deleted with their fields.
+    """
     __class__ = dict
 
+    def __init__(self, key: str = None, *, nested: type = None, **kwargs: Any):
+        self.nested = nested
+        super().__init__(key, **kwargs)
+
+    def _handle_options(self) -> Dict[str, Any]:
+        return {**super()._handle_options(), "nested": self.nested}
+
+    def _init(self, init: Dict) -> None:
+        if self.nested is None:
+            self._redis_init(init)
+        else:
+            self.update(init)
+
     @run_as_lua(lambda self, init: list(itertools.chain.from_iterable((
         (k, self.dumps(v))
          for k, v in init.items()
     ))))
-    def _init(self, init: Dict) -> None:
+    def _redis_init(self, init: Dict) -> None:
         """
         if redis.call("SETNX", KEYS[1], "__PLACEHOLDER__") == 1
         then
@@ -384,15 +665,63 @@ class RedisDict(RedisDataMixin, UserDict):
         """
         pass
 
+    _record_width = 2
+
     def __len__(self) -> int:
-        return self.redis.hlen(self.key)
+        return self.reader.hlen(self.key)
+
+    def _dump_records(self) -> Iterator[bytes]:
+        """with nested, the value of a field is the dumped records of its child"""
+        for k, v in self.redis.hscan_iter(self.key, count=self.dump_chunk_size):
+            yield k
+            yield v if self.nested is None else _pack_records(self._child(v.decode("utf-8"))._dump_records())
+
+    def _load_batch(self, pipeline: Pipeline, records: List[bytes]) -> None:
+        fields, values = records[::2], records[1::2]
+        if self.nested is not None:
+            values = [self._load_child(pipeline, bytes(k).decode("utf-8"), v) for k, v in zip(fields, values)]
+        pipeline.hset(self.key, mapping=dict(zip(fields, values)))
+
+    def _load_child(self, pipeline: Pipeline, field: str, data: bytes) -> str:
+        child_key = self._child_key(field)
+        child = self._child(child_key)
+        pipeline.delete(child_key)
+        for batch in _batches(_iter_records(data, 0), child.dump_chunk_size * child._record_width):
+            child._load_batch(pipeline, batch)
+        return child_key
 
     def __contains__(self, item) -> bool:
-        return self.redis.hexists(self.key, item)
+        return self.reader.hexists(self.key, item)
+
+    def _scan_batch(self, cursor: int, match: Optional[str], count: int) -> Tuple[int, List[Tuple[bytes, bytes]]]:
+        cursor, data = self.reader.hscan(self.key, cursor, match, count)
+        return cursor, list(data.items())
+
+    def _scan_identity(self, record: Tuple[bytes, bytes]) -> bytes:
+        return record[0]
+
+    def _scan_load(self, records: List[Tuple[bytes, bytes]]) -> Iterator[Tuple[str, Any]]:
+        if self.nested is None:
+            values = self.bulk_loads(*(v for _, v in records))
+        else:
+            values = (self._child(v.decode("utf-8")) for _, v in records)
+        return zip((k.decode("utf-8") for k, _ in records), values)
+
+    def _value(self, value: bytes) -> Any:
+        return self.loads(value) if self.nested is None else self._child(value.decode("utf-8"))
+
+    def _child(self, child_key: str, init: Any = None) -> RedisDataMixin:
+        return self.nested(child_key, init=init, schema=self.schema, compressor=self.compressor)
+
+    def _child_key(self, field: str) -> str:
+        return f"{self.key}:{field}"
+
+    def rename(self, new) -> None:
+        assert self.nested is None, "children of nested values can not be renamed with their dict"
+        super().rename(new)
 
     def items(self):
-        for k, v in self.redis.hscan_iter(self.key):
-            yield k.decode("utf-8"), self.loads(v)
+        yield from self.scan()
 
     def __iter__(self):
         for k, _ in self.items():
@@ -403,11 +732,11 @@ class RedisDict(RedisDataMixin, UserDict):
             yield v
 
     def __getitem__(self, item) -> Any:
-        value = self.redis.hget(self.key, item)
+        value = self.reader.hget(self.key, item)
         if value is None:
             _ = {}[item]
 
-        return self.loads(value)
+        return self._value(value)
 
     def __eq__(self, other) -> bool:
         if isinstance(other, type(self)):
@@ -418,14 +747,46 @@ class RedisDict(RedisDataMixin, UserDict):
             return False
 
     def __setitem__(self, key, value) -> None:
-        self.redis.hset(self.key, key, self.dumps(value))
+        if self.nested is None:
+            self.redis.hset(self.key, key, self.dumps(value))
+            return
+
+        child_key = self._child_key(key)
+        child = self._child(temporary_key(child_key))
+        value and child._init(value)
+        with self.redis.pipeline(transaction=same_slot(self.redis, self.key, child_key)) as pipeline:
+            if value:
+                pipeline.rename(child.key, child_key)
+            else:
+                pipeline.delete(child_key)
+            pipeline.hset(self.key, key, child_key)
+            pipeline.execute()
 
     def __delitem__(self, key) -> None:
-        if self.redis.hdel(self.key, key) == 0:
+        if self.nested is None:
+            if self.redis.hdel(self.key, key) == 0:
+                del {}[key]
+            return
+
+        child_key = self.redis.hget(self.key, key)
+        if child_key is None:
             del {}[key]
 
+        child_key = child_key.decode("utf-8")
+        with self.redis.pipeline(transaction=same_slot(self.redis, self.key, child_key)) as pipeline:
+            pipeline.hdel(self.key, key)
+            pipeline.delete(child_key)
+            pipeline.execute()
+
     def clear(self) -> None:
+        if self.nested is not None:
+            for batch in _batches(self.redis.hscan_iter(self.key, count=self.dump_chunk_size), self.dump_chunk_size):
+                with self.redis.pipeline(transaction=False) as pipeline:
+                    for _, child_key in batch:
+                        pipeline.delete(child_key)
+                    pipeline.execute()
         self.redis.delete(self.key)
+        self._forget_initialized_key()
 
     @property
     def data(self) -> Dict:
@@ -436,8 +797,155 @@ class RedisDict(RedisDataMixin, UserDict):
             raise TypeError(f"update expected at most 1 arguments, got {len(args)}")
 
         args and kwds.update(args[0])
+        if self.nested is not None:
+            for k, v in kwds.items():
+                self[k] = v
+            return
         kwds and self.redis.hmset(self.key, {k: self.dumps(v) for k, v in kwds.items()})
 
+    @run_as_lua(lambda self, key, expected, value: [key, int(expected is not None), expected or "", value])
+    def _redis_compare_and_set(self, key: str, expected: Optional[bytes], value: Union[str, bytes]) -> int:
+        """
+        local current = redis.call("HGET", KEYS[1], ARGV[1])
+        if ARGV[2] == "0" and not current or ARGV[2] == "1" and current == ARGV[3] then
+            redis.call("HSET", KEYS[1], ARGV[1], ARGV[4])
+            return 1
+        end
+        return 0
+        """
+        pass
+
+    def atomic_update(self, key, fn: Callable[[Any], Any], *, default: Any = None, retries: int = 10,
+                      backoff: float = 0.001) -> Any:
+        """
+        optimistic read-modify-write of one field: fn(value) is stored only if the field is still unchanged,
+        otherwise it is retried with jittered exponential backoff. Only this field is compared,
+        so writers of other fields never cause a retry.
+        """
+        assert self.nested is None, "nested values are updated through their handles"
+        for attempt in range(retries + 1):
+            current = self.redis.hget(self.key, key)
+            value = fn(default if current is None else self.loads(current))
+            if self._redis_compare_and_set(key, current, self.dumps(value)):
+                return value
+            attempt < retries and time.sleep(random.uniform(0, backoff * 2 ** attempt))
+
+        raise WatchError(f"{key} of {self.key} changed {retries + 1} times during atomic_update")
+
+    @run_as_lua(lambda self, action, key, *arguments: [action, key, *arguments])
+    def _redis_json(self, action: str, key: str, *arguments: str) -> Any:
+        r"""
+        local function skip_string(s, i)
+            local j = i + 1
+            while true do
+                local k = string.find(s, '["\\]', j)
+                if string.sub(s, k, k) == "\\" then
+                    j = k + 2
+                else
+                    return k + 1
+                end
+            end
+        end
+
+        local function skip_value(s, i)
+            local c = string.sub(s, i, i)
+            if c == '"' then
+                return skip_string(s, i)
+            elseif c ~= "{" and c ~= "[" then
+                return string.find(s, "[%s,}%]]", i)
+            end
+            local depth, j = 0, i
+            while true do
+                local k = string.find(s, '[%[%]{}"]', j)
+                local d = string.sub(s, k, k)
+                if d == '"' then
+                    j = skip_string(s, k)
+                else
+                    depth = depth + ((d == "{" or d == "[") and 1 or -1)
+                    j = k + 1
+                    if depth == 0 then
+                        return j
+                    end
+                end
+            end
+        end
+
+        local document = redis.call("HGET", KEYS[1], ARGV[2])
+        if not document then
+            return {0}
+        end
+        local i = string.find(document, "%S")
+        if string.sub(document, i, i) ~= "{" then
+            return redis.error_reply("value of " .. ARGV[2] .. " is not a JSON object")
+        end
+
+        local fields, last = {}, nil
+        i = string.find(document, "%S", i + 1)
+        while string.sub(document, i, i) ~= "}" do
+            local key_end = skip_string(document, i)
+            local start = string.find(document, "%S", string.find(document, ":", key_end) + 1)
+            local stop = skip_value(document, start)
+            fields[cjson.decode(string.sub(document, i, key_end - 1))] = {start, stop}
+            last = string.find(document, "%S", stop)
+            i = string.sub(document, last, last) == "," and string.find(document, "%S", last + 1) or last
+        end
+
+        if ARGV[1] == "get" then
+            local span = fields[cjson.decode(ARGV[3])]
+            if not span then
+                return {1}
+            end
+            return {2, string.sub(document, span[1], span[2] - 1)}
+        end
+
+        local replaced, added = {}, {}
+        for j = 3, #ARGV, 2 do
+            local span = fields[cjson.decode(ARGV[j])]
+            if span then
+                replaced[#replaced + 1] = {span[1], span[2], ARGV[j + 1]}
+            else
+                added[#added + 1] = ARGV[j] .. ": " .. ARGV[j + 1]
+            end
+        end
+        table.sort(replaced, function(a, b) return a[1] < b[1] end)
+
+        local parts, position = {}, 1
+        for _, r in ipairs(replaced) do
+            parts[#parts + 1] = string.sub(document, position, r[1] - 1)
+            parts[#parts + 1] = r[3]
+            position = r[2]
+        end
+        parts[#parts + 1] = string.sub(document, position, i - 1)
+        if #added > 0 then
+            parts[#parts + 1] = (last and ", " or "") .. table.concat(added, ", ")
+        end
+        parts[#parts + 1] = string.sub(document, i)
+        redis.call("HSET", KEYS[1], ARGV[2], table.concat(parts))
+        return {2}
+        """
+        pass
+
+    def patch(self, key, partial: Dict) -> None:
+        """
+        update top level fields of a JSON object value on the server, validated against schema first.
+        Fields not in partial are kept byte for byte, the document is never sent over the network.
+        """
+        assert self.compressor is None and self.nested is None, "only plain JSON values can be patched"
+        arguments = itertools.chain.from_iterable(
+            (json.dumps(k), json.dumps(v)) for k, v in self.validate_fields(partial).items()
+        )
+        status, *_ = self._redis_json("patch", key, *arguments)
+        if status == 0:
+            _ = {}[key]
+
+    def get_field(self, key, field: str) -> Any:
+        """read one top level field of a JSON object value, without transferring the rest of the document"""
+        assert self.compressor is None and self.nested is None, "only plain JSON values have fields"
+        status, *value = self._redis_json("get", key, json.dumps(field))
+        if status != 2:
+            _ = {}[key if status == 0 else field]
+        return json.loads(value[0])
+
     @classmethod
     def fromkeys(cls, iterable, value = None) -> "RedisDict":
         if value is None:
@@ -510,20 +1018,300 @@ class RedisDeque(RedisList, deque):
 
 
 class RedisDefaultDict(RedisDict, defaultdict):
-    def __init__(self, key: str = None, *, default_factory: Callable = None, init: Any = None, schema: Any = None):
+    def __init__(self, key: str = None, *, default_factory: Callable = None, **kwargs: Any):
         self.default_factory = default_factory
-        super().__init__(key, init=init, schema=schema)
+        super().__init__(key, **kwargs)
+
+    def _handle_options(self) -> Dict[str, Any]:
+        return {**super()._handle_options(), "default_factory": self.default_factory}
+
+    @run_as_lua(lambda self, *pairs: list(pairs))
+    def _redis_setdefault(self, *pairs: Union[str, bytes]) -> List[bytes]:
+        """
+        local result = {}
+        for i = 1, #ARGV, 2 do
+            redis.call("HSETNX", KEYS[1], ARGV[i], ARGV[i + 1])
+            result[#result + 1] = redis.call("HGET", KEYS[1], ARGV[i])
+        end
+        return result
+        """
+        pass
+
+    def _default_pair(self, key) -> Tuple[str, Union[str, bytes]]:
+        return key, self.dumps(self.default_factory()) if self.nested is None else self._child_key(key)
+
+    def _default_value(self, value: bytes) -> Any:
+        if self.nested is None:
+            return self.loads(value)
+        return self._child(value.decode("utf-8"), init=self.default_factory() or None)
 
     def __missing__(self, key):
         if self.default_factory is None:
             return super().__missing__(key)
 
-        value = self[key] = self.default_factory()
-        return value
+        value, = self._redis_setdefault(*self._default_pair(key))
+        return self._default_value(value)
 
     def __getitem__(self, item) -> Any:
         value = self.redis.hget(self.key, item)
         if value is None:
             return self.__missing__(item)
 
-        return self.loads(value)
+        return self._value(value)
+
+    def get_many_with_default(self, *keys) -> List[Any]:
+        """one HMGET, then one script storing defaults of all missing keys, concurrent writers never lose values"""
+        values = self.redis.hmget(self.key, keys) if keys else []
+        missing = [k for k, v in zip(keys, values) if v is None]
+        if not missing:
+            return [self._value(v) for v in values]
+
+        assert self.default_factory is not None, "default_factory is required for missing keys"
+        pairs = itertools.chain.from_iterable(self._default_pair(k) for k in missing)
+        defaults = dict(zip(missing, self._redis_setdefault(*pairs)))
+        return [self._default_value(defaults[k]) if v is None else self._value(v) for k, v in zip(keys, values)]
+
+
+class RedisHyperLogLog(_StringRecords, RedisDataMixin):
+    def _init(self, init: Iterable) -> None:
+        self.update(*init)
+
+    def add(self, element) -> bool:
+        return bool(self.redis.pfadd(self.key, self.dumps(element)))
+
+    def update(self, *element) -> bool:
+        return bool(element) and bool(self.redis.pfadd(self.key, *self.bulk_dumps(*element)))
+
+    def __len__(self) -> int:
+        return self.reader.pfcount(self.key)
+
+    def merge(self, *others: "RedisHyperLogLog") -> "RedisHyperLogLog":
+        self.redis.pfmerge(self.key, self.key, *(i.key for i in others))
+        return self
+
+    def __ior__(self, other: "RedisHyperLogLog") -> "RedisHyperLogLog":
+        return self.merge(other)
+
+    def __or__(self, other: "RedisHyperLogLog") -> "RedisHyperLogLog":
+        union = type(self)(temporary_key(self.key), schema=self.schema, compressor=self.compressor)
+        self.redis.pfmerge(union.key, self.key, other.key)
+        return union
+
+    def clear(self) -> None:
+        self.redis.delete(self.key)
+        self._forget_initialized_key()
+
+
+_hash_mask = (1 << 64) - 1
+
+
+def _bloom_positions(data: List[bytes], hashes: int, size: int) -> List[List[int]]:
+    """double hashing with both halves of a 128 bits blake2b digest, vectorized by numpy when installed"""
+    digests = [hashlib.blake2b(i, digest_size=16).digest() for i in data]
+    if numpy is not None:
+        halves = numpy.frombuffer(b"".join(digests), dtype="<u8").reshape(-1, 2)
+        positions = halves[:, :1] + numpy.arange(hashes, dtype=numpy.uint64) * halves[:, 1:]
+        return (positions % numpy.uint64(size)).tolist()
+
+    positions = []
+    for digest in digests:
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        positions.append([(h1 + i * h2 & _hash_mask) % size for i in range(hashes)])
+    return positions
+
+
+class RedisBloomFilter(_StringRecords, RedisDataMixin):
+    """
+    bloom filter on a plain redis bitmap, sized for capacity elements at error_rate false positives.
+    Bits of a batch of elements are set and tested by one script call.
+    """
+    batch_size: int = 1000
+
+    def __init__(self, key: str = None, *, capacity: int = 1000000, error_rate: float = 0.01, **kwargs: Any):
+        assert capacity > 0 and 0 < error_rate < 1, "capacity must > 0 and error_rate must in (0, 1)"
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        assert self.size <= 2 ** 32, "a redis bitmap holds 2 ** 32 bits at most"
+        super().__init__(key, **kwargs)
+
+    def _handle_options(self) -> Dict[str, Any]:
+        return {**super()._handle_options(), "capacity": self.capacity, "error_rate": self.error_rate}
+
+    def _init(self, init: Iterable) -> None:
+        self.update(*init)
+
+    def _positions(self, elements: Iterable) -> Iterator[List[int]]:
+        for batch in _batches(iter(elements), self.batch_size):
+            data = [i.encode("utf-8") if isinstance(i, str) else bytes(i) for i in self.bulk_dumps(*batch)]
+            yield [self.hashes, *itertools.chain.from_iterable(_bloom_positions(data, self.hashes, self.size))]
+
+    @run_as_lua(lambda self, arguments: arguments)
+    def _redis_set_bits(self, arguments: List[int]) -> List[int]:
+        """
+        local hashes = tonumber(ARGV[1])
+        local result = {}
+        for i = 0, (#ARGV - 1) / hashes - 1 do
+            local added = 0
+            for j = 2 + i * hashes, 1 + (i + 1) * hashes do
+                if redis.call("SETBIT", KEYS[1], ARGV[j], 1) == 0 then
+                    added = 1
+                end
+            end
+            result[i + 1] = added
+        end
+        return result
+        """
+        pass
+
+    @run_as_lua(lambda self, arguments: arguments)
+    def _redis_get_bits(self, arguments: List[int]) -> List[int]:
+        """
+        local hashes = tonumber(ARGV[1])
+        local result = {}
+        for i = 0, (#ARGV - 1) / hashes - 1 do
+            local found = 1
+            for j = 2 + i * hashes, 1 + (i + 1) * hashes do
+                if redis.call("GETBIT", KEYS[1], ARGV[j]) == 0 then
+                    found = 0
+                    break
+                end
+            end
+            result[i + 1] = found
+        end
+        return result
+        """
+        pass
+
+    def update(self, *element) -> List[bool]:
+        """add elements, True for each element that was certainly not in the filter before"""
+        return [bool(i) for arguments in self._positions(element) for i in self._redis_set_bits(arguments)]
+
+    def add(self, element) -> bool:
+        return self.update(element)[0]
+
+    def contains_many(self, *element) -> List[bool]:
+        return [bool(i) for arguments in self._positions(element) for i in self._redis_get_bits(arguments)]
+
+    def __contains__(self, element) -> bool:
+        return self.contains_many(element)[0]
+
+    def __len__(self) -> int:
+        """estimated number of elements added"""
+        bits = self.reader.bitcount(self.key)
+        if bits >= self.size:
+            return self.capacity
+        return round(-self.size / self.hashes * math.log(1 - bits / self.size))
+
+    def clear(self) -> None:
+        self.redis.delete(self.key)
+        self._forget_initialized_key()
+
+
+class RedisBitmap(_StringRecords, RedisDataMixin):
+    """bit array on a redis string, bit 0 is the most significant bit of the first byte as in SETBIT"""
+    batch_size: int = 1000
+
+    def _init(self, init: Union[BytesLike, Iterable[int]]) -> None:
+        if isinstance(init, (bytes, bytearray, memoryview)):
+            self.from_bytes(init)
+        else:
+            self.set_many(init)
+
+    def __len__(self) -> int:
+        return self.reader.strlen(self.key) * 8
+
+    def _index(self, index: int) -> int:
+        index = index + len(self) if index < 0 else index
+        if index < 0:
+            _ = [][index]
+        return index
+
+    def __getitem__(self, index: int) -> int:
+        return self.reader.getbit(self.key, self._index(index))
+
+    def __setitem__(self, index: int, value: int) -> None:
+        self.redis.setbit(self.key, self._index(index), value)
+
+    def _bitfield(self, indices: Iterable[int], operation: Callable) -> List[int]:
+        result = []
+        with self.redis.pipeline(transaction=False) as pipeline:
+            for batch in _batches(iter(indices), self.batch_size):
+                bitfield = pipeline.bitfield(self.key)
+                for index in batch:
+                    operation(bitfield, index)
+                bitfield.execute()
+            for response in pipeline.execute():
+                result.extend(response)
+        return result
+
+    def set_many(self, indices: Iterable[int], value: int = 1) -> List[int]:
+        """set bits with one BITFIELD per batch_size indices, all sent in one round trip, returns the old bits"""
+        return self._bitfield(indices, lambda bitfield, index: bitfield.set("u1", index, value))
+
+    def get_many(self, indices: Iterable[int]) -> List[int]:
+        return self._bitfield(indices, lambda bitfield, index: bitfield.get("u1", index))
+
+    def count(self, bits: range = None) -> int:
+        """count set bits, in a range of bit indices when given"""
+        if bits is None:
+            return self.reader.bitcount(self.key)
+
+        assert bits.step == 1, "only continuous ranges can be counted"
+        if not bits:
+            return 0
+        return self.reader.bitcount(self.key, bits.start, bits.stop - 1, "BIT")
+
+    def bitop(self, operation: str, *others: "RedisBitmap", key: str = None) -> "RedisBitmap":
+        """run BITOP on the server, into a new bitmap unless key is given"""
+        result = type(self)(key or temporary_key(self.key))
+        self.redis.bitop(operation, result.key, self.key, *(i.key for i in others))
+        return result
+
+    def __and__(self, other: "RedisBitmap") -> "RedisBitmap":
+        return self.bitop("AND", other)
+
+    def __or__(self, other: "RedisBitmap") -> "RedisBitmap":
+        return self.bitop("OR", other)
+
+    def __xor__(self, other: "RedisBitmap") -> "RedisBitmap":
+        return self.bitop("XOR", other)
+
+    def __invert__(self) -> "RedisBitmap":
+        return self.bitop("NOT")
+
+    def __iand__(self, other: "RedisBitmap") -> "RedisBitmap":
+        return self.bitop("AND", other, key=self.key)
+
+    def __ior__(self, other: "RedisBitmap") -> "RedisBitmap":
+        return self.bitop("OR", other, key=self.key)
+
+    def __ixor__(self, other: "RedisBitmap") -> "RedisBitmap":
+        return self.bitop("XOR", other, key=self.key)
+
+    def to_bytes(self) -> bytes:
+        return self.reader.get(self.key) or b""
+
+    def __bytes__(self) -> bytes:
+        return self.to_bytes()
+
+    def from_bytes(self, data: BytesLike) -> "RedisBitmap":
+        self.redis.set(self.key, data)
+        return self
+
+    def to_numpy(self, packed: bool = False):
+        """a read only uint8 view over the fetched bytes when packed, otherwise one element per bit"""
+        assert numpy is not None, "please install numpy first"
+        data = numpy.frombuffer(self.to_bytes(), dtype=numpy.uint8)
+        return data if packed else numpy.unpackbits(data)
+
+    def from_numpy(self, array, packed: bool = False) -> "RedisBitmap":
+        """the reverse of to_numpy, array holds uint8 bytes when packed, otherwise one element per bit"""
+        assert numpy is not None, "please install numpy first"
+        array = array.astype(numpy.uint8, copy=False) if packed else numpy.packbits(array.astype(bool))
+        return self.from_bytes(memoryview(numpy.ascontiguousarray(array)))
+
+    def clear(self) -> None:
+        self.redis.delete(self.key)
+        self._forget_initialized_key()
@@ -0,0 +1,94 @@
+import zlib
+import functools
+from typing import Union, Optional
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover
+    lz4 = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+__all__ = ["Compressor"]
+
+
+class Compressor:
+    """
+    values shorter than threshold are stored raw, so small hash fields keep listpack encoding.
+    Raw values starting with marker are escaped with the raw codec, so they are never taken as compressed.
+    """
+    marker = b"\x00RC"
+    codecs = {"zlib": b"z", "lz4": b"4", "zstd": b"s"}
+    raw_codec = b"r"
+
+    def __init__(self, codec: str = "zlib", *, threshold: int = 1024, level: int = None, zstd_dict: bytes = None):
+        assert codec in self.codecs, f"unsupported codec {codec}"
+        assert codec != "lz4" or lz4 is not None, "please install lz4 first"
+        assert codec != "zstd" or zstandard is not None, "please install zstandard first"
+        assert zstd_dict is None or codec == "zstd", "zstd_dict only works with zstd"
+
+        self.codec = codec
+        self.threshold = threshold
+        self.level = level
+        self._zstd_dict_data = zstd_dict
+        self.zstd_dict = zstd_dict and zstandard.ZstdCompressionDict(zstd_dict)
+        self._header = self.marker + self.codecs[codec]
+
+        self.raw_count = 0
+        self.compressed_count = 0
+        self.original_bytes = 0
+        self.compressed_bytes = 0
+
+    def __reduce__(self):
+        return functools.partial(
+            type(self), self.codec, threshold=self.threshold, level=self.level, zstd_dict=self._zstd_dict_data
+        ), ()
+
+    @property
+    def ratio(self) -> float:
+        if not self.compressed_bytes:
+            return 1.0
+        return self.original_bytes / self.compressed_bytes
+
+    def compress(self, data: Union[str, bytes, memoryview]) -> Union[str, bytes, memoryview]:
+        raw = data.encode("utf-8") if isinstance(data, str) else data
+        if len(raw) < self.threshold:
+            return self._raw(data, raw)
+
+        compressed = self._header + self._compress(raw)
+        if len(compressed) >= len(raw):
+            return self._raw(data, raw)
+
+        self.compressed_count += 1
+        self.original_bytes += len(raw)
+        self.compressed_bytes += len(compressed)
+        return compressed
+
+    def _raw(self, data: Union[str, bytes, memoryview], raw: Union[bytes, memoryview]) -> Union[str, bytes]:
+        self.raw_count += 1
+        return self.marker + self.raw_codec + raw if raw[:len(self.marker)] == self.marker else data
+
+    def decompress(self, data: Optional[Union[bytes, memoryview]]) -> Optional[Union[bytes, memoryview]]:
+        if not isinstance(data, (bytes, memoryview)) or data[:len(self.marker)] != self.marker:
+            return data
+
+        codec, payload = data[len(self.marker):len(self.marker) + 1], data[len(self.marker) + 1:]
+        if codec == self.raw_codec:
+            return payload
+        if codec == self.codecs["zlib"]:
+            return zlib.decompress(payload)
+        if codec == self.codecs["lz4"]:
+            return lz4.frame.decompress(payload)
+        if codec == self.codecs["zstd"]:
+            return zstandard.ZstdDecompressor(dict_data=self.zstd_dict).decompress(payload)
+        raise ValueError(f"unknown compression codec {codec!r}")
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zlib":
+            return zlib.compress(data, -1 if self.level is None else self.level)
+        if self.codec == "lz4":
+            return lz4.frame.compress(data, compression_level=self.level or 0)
+        return zstandard.ZstdCompressor(level=self.level or 3, dict_data=self.zstd_dict).compress(data)
@@ -0,0 +1,84 @@
+import hashlib
+from collections import OrderedDict
+from typing import Any, Iterator, Tuple
+
+from redis.exceptions import ResponseError
+
+__all__ = ["ScanCursor"]
+
+
+class ScanCursor:
+    """
+    resumable SCAN over a set or a hash.
+
+    cursor is the SCAN cursor of the batch being consumed, so a scan resumed from it repeats at most one batch.
+    Members already yielded are skipped while they are among the last dedup_size members seen.
+    partition=(index, total) scans only the cursors whose lowest bits equal index. Redis visits cursors in
+    reverse binary order, so the lowest bits of the cursor change last and total partitions cover the keyspace
+    when total is a power of 2. A SCAN call may run past the end of its partition, so members near the
+    boundaries can be yielded by two partitions. Small sets and hashes in compact encodings are scanned by
+    partition 0 only.
+    """
+    def __init__(
+            self, collection: Any, cursor: int = 0, *, count: int = 1000, match: str = None,
+            dedup_size: int = 100000, partition: Tuple[int, int] = (0, 1),
+    ):
+        index, total = partition
+        assert total > 0 and total & (total - 1) == 0, "partition total must be a power of 2"
+        assert 0 <= index < total, "partition index out of range"
+
+        self.collection = collection
+        self.cursor = cursor or index
+        self.count = count
+        self.match = match
+        self.dedup_size = dedup_size
+        self.partition = partition
+        self.finished = False
+        self._seen = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(key={self.collection.key!r}, cursor={self.cursor}, partition={self.partition})"
+
+    def _owns(self, cursor: int) -> bool:
+        index, total = self.partition
+        return cursor != 0 and cursor & (total - 1) == index
+
+    def _seen_before(self, identity: bytes) -> bool:
+        if not self.dedup_size:
+            return False
+
+        digest = hashlib.blake2b(identity, digest_size=8).digest()
+        if digest in self._seen:
+            return True
+
+        self._seen[digest] = None
+        len(self._seen) > self.dedup_size and self._seen.popitem(last=False)
+        return False
+
+    def _compact(self) -> bool:
+        try:
+            encoding = self.collection.reader.object("encoding", self.collection.key)
+        except ResponseError:
+            return False
+        return encoding not in (None, b"hashtable", "hashtable")
+
+    def __iter__(self) -> Iterator:
+        if self.finished:
+            return
+
+        index, total = self.partition
+        if index and self._compact():
+            self.finished = True
+            return
+
+        while True:
+            next_cursor, records = self.collection._scan_batch(self.cursor, self.match, self.count)
+            yield from self.collection._scan_load([
+                i for i in records if not self._seen_before(self.collection._scan_identity(i))
+            ])
+
+            if not self._owns(int(next_cursor)):
+                self.finished = True
+                return
+
+            self.cursor = int(next_cursor)
@@ -0,0 +1,294 @@
+import time
+import types
+import inspect
+import threading
+import functools
+from typing import Any, Callable, List, Optional
+
+from attr import dataclass
+
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover
+    prometheus_client = None
+
+try:
+    from opentelemetry import metrics
+except ImportError:  # pragma: no cover
+    metrics = None
+
+__all__ = [
+    "Operation", "subscribe", "unsubscribe", "instrument", "instrumented_client",
+    "PrometheusExporter", "OpenTelemetryExporter",
+]
+
+
+@dataclass
+class Operation:
+    name: str
+    key: Optional[str] = None
+    depth: int = 0
+    duration: float = 0.0
+    serialization_time: float = 0.0
+    hashing_time: float = 0.0
+    network_time: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    round_trips: int = 0
+
+
+_subscribers: List[Callable[[Operation], None]] = []
+
+
+class _Operations(threading.local):
+    def __init__(self):
+        self.stack: List[Operation] = []
+
+
+_operations = _Operations()
+
+
+def subscribe(callback: Callable[[Operation], None]) -> None:
+    _subscribers.append(callback)
+
+
+def unsubscribe(callback: Callable[[Operation], None]) -> None:
+    _subscribers.remove(callback)
+
+
+def active() -> bool:
+    return bool(_operations.stack)
+
+
+def in_context(func: Callable) -> Callable:
+    """func called by another thread, such as an executor, records into the operations running in this one"""
+    stack = list(_operations.stack)
+
+    @functools.wraps(func)
+    def __inner(*args, **kwargs):
+        outer, _operations.stack = _operations.stack, stack
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _operations.stack = outer
+
+    return __inner
+
+
+def record(**counters: Any) -> None:
+    for operation in _operations.stack:
+        for name, value in counters.items():
+            setattr(operation, name, getattr(operation, name) + value)
+
+
+def _payload_size(data: Any) -> int:
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data)
+    if isinstance(data, str):
+        return len(data.encode("utf-8"))
+    if isinstance(data, (list, tuple)):
+        return sum(_payload_size(i) for i in data)
+    return 0
+
+
+def _emit(operation: Operation) -> None:
+    for callback in list(_subscribers):
+        callback(operation)
+
+
+class _Running:
+    def __init__(self, operation: Operation):
+        self.operation = operation
+
+    def __enter__(self):
+        _operations.stack.append(self.operation)
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.operation.duration += time.perf_counter() - self.start
+        _operations.stack.pop()
+
+
+@types.coroutine
+def _stepwise(coroutine, operation: Operation):
+    """like generators, only the steps of coroutine are measured, other tasks run outside of operation"""
+    steps = coroutine.__await__()
+    value, error = None, None
+    while True:
+        with _Running(operation):
+            try:
+                future = steps.send(value) if error is None else steps.throw(error)
+            except StopIteration as stop:
+                return stop.value
+        try:
+            value, error = (yield future), None
+        except BaseException as e:
+            value, error = None, e
+
+
+def instrument(func: Callable, name: str = None) -> Callable:
+    """nearly free when nobody subscribes, nested operations are emitted with depth > 0"""
+    name = name or func.__qualname__
+
+    def create_operation(self) -> Operation:
+        return Operation(name=name, key=getattr(self, "key", None), depth=len(_operations.stack))
+
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def __inner(self, *args, **kwargs):
+            if not _subscribers:
+                yield from func(self, *args, **kwargs)
+                return
+
+            operation = create_operation(self)
+            generator = func(self, *args, **kwargs)
+            try:
+                while True:
+                    with _Running(operation):
+                        try:
+                            item = next(generator)
+                        except StopIteration:
+                            return
+                    yield item
+            finally:
+                _emit(operation)
+    elif inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def __inner(self, *args, **kwargs):
+            if not _subscribers:
+                return await func(self, *args, **kwargs)
+
+            operation = create_operation(self)
+            try:
+                return await _stepwise(func(self, *args, **kwargs), operation)
+            finally:
+                _emit(operation)
+    else:
+        @functools.wraps(func)
+        def __inner(self, *args, **kwargs):
+            if not _subscribers:
+                return func(self, *args, **kwargs)
+
+            operation = create_operation(self)
+            try:
+                with _Running(operation):
+                    return func(self, *args, **kwargs)
+            finally:
+                _emit(operation)
+
+    return __inner
+
+
+class _InstrumentedPipeline:
+    def __init__(self, pipeline):
+        self._pipeline = pipeline
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pipeline, name)
+
+    def __enter__(self):
+        self._pipeline.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return self._pipeline.__exit__(exc_type, exc_val, exc_tb)
+
+    def __len__(self) -> int:
+        return len(self._pipeline)
+
+    def execute(self, *args, **kwargs) -> List:
+        bytes_out = sum(_payload_size(command[0]) for command in self._pipeline.command_stack)
+        start = time.perf_counter()
+        response = self._pipeline.execute(*args, **kwargs)
+        record(
+            network_time=time.perf_counter() - start, round_trips=1,
+            bytes_out=bytes_out, bytes_in=_payload_size(response),
+        )
+        return response
+
+
+class _InstrumentedClient:
+    """commands of redis.commands are bound to the proxy, so every execute_command is observed"""
+    def __init__(self, client):
+        self._client = client
+
+    @property
+    def __class__(self):
+        """isinstance checks, such as the RedisCluster one of same_slot, see the wrapped client"""
+        return type(self._client)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(type(self._client), name, None)
+        if inspect.isfunction(attr) and attr.__module__.startswith("redis.commands"):
+            return types.MethodType(attr, self)
+        return getattr(self._client, name)
+
+    def execute_command(self, *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        response = self._client.execute_command(*args, **kwargs)
+        record(
+            network_time=time.perf_counter() - start, round_trips=1,
+            bytes_out=_payload_size(args), bytes_in=_payload_size(response),
+        )
+        return response
+
+    def pipeline(self, *args, **kwargs) -> _InstrumentedPipeline:
+        return _InstrumentedPipeline(self._client.pipeline(*args, **kwargs))
+
+
+def instrumented_client(client):
+    return _InstrumentedClient(client) if _operations.stack else client
+
+
+class PrometheusExporter:
+    def __init__(self, namespace: str = "redis_cooker", registry: Any = None):
+        assert prometheus_client is not None, "please install prometheus_client first"
+        options = {"namespace": namespace, "labelnames": ["operation"]}
+        registry is not None and options.update(registry=registry)
+        self.duration = prometheus_client.Histogram("operation_seconds", "operation latency", **options)
+        self.serialization = prometheus_client.Counter("serialization_seconds", "serialization time", **options)
+        self.hashing = prometheus_client.Counter("hashing_seconds", "key hashing time", **options)
+        self.network = prometheus_client.Counter("network_seconds", "network time", **options)
+        self.bytes_in = prometheus_client.Counter("received_bytes", "bytes received", **options)
+        self.bytes_out = prometheus_client.Counter("sent_bytes", "bytes sent", **options)
+        self.round_trips = prometheus_client.Histogram(
+            "round_trips", "round trips per operation", buckets=(1, 2, 3, 5, 10, 50, 100), **options
+        )
+
+    def __call__(self, operation: Operation) -> None:
+        self.duration.labels(operation.name).observe(operation.duration)
+        if operation.depth:
+            return
+
+        self.serialization.labels(operation.name).inc(operation.serialization_time)
+        self.hashing.labels(operation.name).inc(operation.hashing_time)
+        self.network.labels(operation.name).inc(operation.network_time)
+        self.bytes_in.labels(operation.name).inc(operation.bytes_in)
+        self.bytes_out.labels(operation.name).inc(operation.bytes_out)
+        self.round_trips.labels(operation.name).observe(operation.round_trips)
+
+
+class OpenTelemetryExporter:
+    def __init__(self, meter: Any = None):
+        assert metrics is not None, "please install opentelemetry-api first"
+        meter = meter or metrics.get_meter("redis_cooker")
+        self.duration = meter.create_histogram("redis_cooker.operation.duration", unit="s")
+        self.serialization = meter.create_counter("redis_cooker.serialization.duration", unit="s")
+        self.hashing = meter.create_counter("redis_cooker.hashing.duration", unit="s")
+        self.network = meter.create_counter("redis_cooker.network.duration", unit="s")
+        self.bytes_in = meter.create_counter("redis_cooker.bytes.received", unit="By")
+        self.bytes_out = meter.create_counter("redis_cooker.bytes.sent", unit="By")
+        self.round_trips = meter.create_histogram("redis_cooker.round_trips")
+
+    def __call__(self, operation: Operation) -> None:
+        attributes = {"operation": operation.name}
+        self.duration.record(operation.duration, attributes)
+        if operation.depth:
+            return
+
+        self.serialization.add(operation.serialization_time, attributes)
+        self.hashing.add(operation.hashing_time, attributes)
+        self.network.add(operation.network_time, attributes)
+        self.bytes_in.add(operation.bytes_in, attributes)
+        self.bytes_out.add(operation.bytes_out, attributes)
+        self.round_trips.record(operation.round_trips, attributes)
@@ -0,0 +1,194 @@
+import time
+import uuid
+import random
+import threading
+from typing import Optional
+
+from redis.client import Redis
+
+from .atomic import run_as_lua
+from .clients import current_redis_client
+
+__all__ = ["RedisLock", "RedisSemaphore"]
+
+
+class _Lease:
+    key_delimiter = ":"
+
+    def __init__(
+            self, name: str, *, timeout: float = 10.0, blocking: bool = True, blocking_timeout: float = None,
+            auto_extend: bool = False, backoff: float = 0.001, max_backoff: float = 0.1,
+    ):
+        self.key = self.key_delimiter.join(["RedisCooker", type(self).__name__, f"{{{name}}}"])
+        self.fencing_key = self.key_delimiter.join([self.key, "Fencing"])
+        self.timeout = timeout
+        self.blocking = blocking
+        self.blocking_timeout = blocking_timeout
+        self.auto_extend = auto_extend
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.redis: Redis = current_redis_client()
+
+        self.token: Optional[str] = None
+        self.fencing_token: Optional[int] = None
+        self._extender: Optional[threading.Thread] = None
+        self._released = threading.Event()
+
+    @property
+    def _timeout_ms(self) -> int:
+        return int(self.timeout * 1000)
+
+    def _try_acquire(self, token: str) -> Optional[int]:
+        raise NotImplementedError
+
+    def _release(self, token: str) -> int:
+        raise NotImplementedError
+
+    def _extend(self, token: str) -> int:
+        raise NotImplementedError
+
+    def acquire(self, blocking: bool = None, blocking_timeout: float = None) -> bool:
+        """the uncontended path is a single round trip, contended callers retry with jittered exponential backoff"""
+        assert self.token is None, f"{type(self).__name__} is already acquired"
+        blocking = self.blocking if blocking is None else blocking
+        blocking_timeout = self.blocking_timeout if blocking_timeout is None else blocking_timeout
+        deadline = None if blocking_timeout is None else time.monotonic() + blocking_timeout
+
+        token = uuid.uuid4().hex
+        backoff = self.backoff
+        while True:
+            fencing_token = self._try_acquire(token)
+            if fencing_token is not None:
+                break
+            if not blocking or deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(random.uniform(0, backoff))
+            backoff = min(backoff * 2, self.max_backoff)
+
+        self.token, self.fencing_token = token, int(fencing_token)
+        self.auto_extend and self._start_extender()
+        return True
+
+    def release(self) -> bool:
+        """False means the lease expired and may have been taken by someone else"""
+        assert self.token is not None, f"{type(self).__name__} is not acquired"
+        self._released.set()
+        self._extender is not None and self._extender.join()
+        token, self.token, self.fencing_token, self._extender = self.token, None, None, None
+        return bool(self._release(token))
+
+    def extend(self) -> bool:
+        """reset the lease to timeout seconds from now, False means it is lost"""
+        token = self.token
+        return token is not None and bool(self._extend(token))
+
+    def _start_extender(self) -> None:
+        self._released.clear()
+        self._extender = threading.Thread(target=self._extend_forever, name="RedisCooker:Lease", daemon=True)
+        self._extender.start()
+
+    def _extend_forever(self) -> None:
+        while not self._released.wait(self.timeout / 3):
+            if not self.extend():
+                return
+
+    def __enter__(self):
+        if not self.acquire():
+            raise TimeoutError(f"unable to acquire {self.key}")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.token is not None and self.release()
+
+
+class RedisLock(_Lease):
+    """
+    mutual exclusion with SET NX PX.
+    fencing_token increases with every acquisition, pass it to the protected resource to reject stale holders.
+    """
+    @run_as_lua(lambda self, token: [token, self._timeout_ms], lambda self, token: [self.key, self.fencing_key])
+    def _try_acquire(self, token: str) -> Optional[int]:
+        """
+        if redis.call("SET", KEYS[1], ARGV[1], "NX", "PX", ARGV[2]) then
+            return redis.call("INCR", KEYS[2])
+        end
+        return false
+        """
+        pass
+
+    @run_as_lua(lambda self, token: [token])
+    def _release(self, token: str) -> int:
+        """
+        if redis.call("GET", KEYS[1]) == ARGV[1] then
+            return redis.call("DEL", KEYS[1])
+        end
+        return 0
+        """
+        pass
+
+    @run_as_lua(lambda self, token: [token, self._timeout_ms])
+    def _extend(self, token: str) -> int:
+        """
+        if redis.call("GET", KEYS[1]) == ARGV[1] then
+            return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+        end
+        return 0
+        """
+        pass
+
+    def locked(self) -> bool:
+        return bool(self.redis.exists(self.key))
+
+    def owned(self) -> bool:
+        return self.token is not None and self.redis.get(self.key) == self.token.encode()
+
+
+class RedisSemaphore(_Lease):
+    """
+    up to limit holders, kept in a sorted set scored by their expiry in server time,
+    so leases of crashed holders are reclaimed without clock agreement between clients.
+    """
+    def __init__(self, name: str, limit: int, **kwargs):
+        assert limit > 0, "limit must > 0"
+        super().__init__(name, **kwargs)
+        self.limit = limit
+
+    @run_as_lua(
+        lambda self, token: [token, self.limit, self._timeout_ms],
+        lambda self, token: [self.key, self.fencing_key],
+    )
+    def _try_acquire(self, token: str) -> Optional[int]:
+        """
+        local now = redis.call("TIME")
+        local ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+        redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", ms)
+        if redis.call("ZCARD", KEYS[1]) < tonumber(ARGV[2]) then
+            redis.call("ZADD", KEYS[1], ms + tonumber(ARGV[3]), ARGV[1])
+            redis.call("PEXPIRE", KEYS[1], ARGV[3])
+            return redis.call("INCR", KEYS[2])
+        end
+        return false
+        """
+        pass
+
+    @run_as_lua(lambda self, token: [token])
+    def _release(self, token: str) -> int:
+        """
+        return redis.call("ZREM", KEYS[1], ARGV[1])
+        """
+        pass
+
+    @run_as_lua(lambda self, token: [token, self._timeout_ms])
+    def _extend(self, token: str) -> int:
+        """
+        local now = redis.call("TIME")
+        local ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+        local expiry = redis.call("ZSCORE", KEYS[1], ARGV[1])
+        if expiry and tonumber(expiry) > ms then
+            redis.call("ZADD", KEYS[1], ms + tonumber(ARGV[2]), ARGV[1])
+            redis.call("PEXPIRE", KEYS[1], ARGV[2])
+            return 1
+        end
+        return 0
+        """
+        pass
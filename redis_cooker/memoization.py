@@ -0,0 +1,187 @@
+import json
+import time
+import asyncio
+import hashlib
+import inspect
+import functools
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from redis.client import Pipeline
+
+from .instrumentation import instrument, in_context, active, record
+from .mixins import RedisDataMixin, _batches
+from .utils import escape_glob
+
+__all__ = ["Memoized", "AsyncMemoized", "memoize"]
+
+_MISSING = object()
+
+
+def _unhashable(data: Any):
+    raise TypeError(f"{type(data).__name__} arguments have no JSON form, memoize with hash_key= to identify them")
+
+
+class Memoized(RedisDataMixin):
+    """
+    results of fn are stored under a blake2b hash of its bound arguments, through the same adapters as collections.
+    With ttl every result is a string f"{key}:{hash}" expiring after ttl seconds, otherwise a field of the hash key.
+    Arguments are hashed by their JSON form, hash_key(*args, **kwargs) returns a JSON serializable identity for
+    arguments without one, such as self of methods. Other arguments raise TypeError.
+    Custom keys should carry a {hash tag} in cluster, so the strings of one function stay in one slot.
+    """
+    _record_width = 2
+
+    def __init__(self, fn: Callable, key: str = None, *, ttl: float = None, hash_key: Callable = None, **kwargs: Any):
+        self.fn = fn
+        self.ttl = ttl
+        self.hash_key = hash_key
+        self.signature = inspect.signature(fn)
+        functools.update_wrapper(self, fn)
+        super().__init__(key or f"RedisCooker:Memoize:{{{fn.__module__}.{fn.__qualname__}}}", **kwargs)
+
+    def __reduce__(self):
+        """pickled by reference, as the function it decorates"""
+        return self.__qualname__
+
+    def __get__(self, instance: Any, owner: type = None) -> Callable:
+        """memoized methods are bound like functions, self is hashed with the other arguments"""
+        return self if instance is None else functools.partial(self, instance)
+
+    def _entry_key(self, field: str) -> str:
+        return f"{self.key}:{field}"
+
+    def _field(self, args: Tuple, kwargs: Dict) -> str:
+        start = active() and time.perf_counter()
+        bound = self.signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        identity = [bound.args, bound.kwargs] if self.hash_key is None else self.hash_key(*args, **kwargs)
+        data = json.dumps(identity, sort_keys=True, separators=(",", ":"), default=_unhashable)
+        field = hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+        start and record(hashing_time=time.perf_counter() - start)
+        return field
+
+    @staticmethod
+    def _arguments(call: Any) -> Tuple[Tuple, Dict]:
+        """a call of many is a tuple of positional arguments, any other value is the only argument"""
+        return (call if isinstance(call, tuple) else (call,)), {}
+
+    def _lookup(self, fields: List[str]) -> List:
+        if self.ttl is None:
+            data = self.reader.hmget(self.key, fields)
+        else:
+            data = self.reader.mget([self._entry_key(i) for i in fields])
+        hits = iter(self.bulk_loads(*(i for i in data if i is not None)))
+        return [_MISSING if i is None else next(hits) for i in data]
+
+    def _store(self, results: Dict[str, Any]) -> None:
+        data = dict(zip(results, self.bulk_dumps(*results.values())))
+        if self.ttl is None:
+            self.redis.hset(self.key, mapping=data)
+            return
+
+        with self.redis.pipeline(transaction=False) as pipeline:
+            for field, value in data.items():
+                pipeline.set(self._entry_key(field), value, px=max(1, int(self.ttl * 1000)))
+            pipeline.execute()
+
+    def _plan(self, calls: Iterable) -> Tuple[List[str], List, Dict[str, Tuple[Tuple, Dict]]]:
+        """fields and cached values of calls, and the arguments of distinct misses"""
+        calls = [self._arguments(i) for i in calls]
+        fields = [self._field(*i) for i in calls]
+        values = self._lookup(fields) if fields else []
+        misses = {field: call for field, call, value in zip(fields, calls, values) if value is _MISSING}
+        return fields, values, misses
+
+    def _results(self, fields: List[str], values: List, computed: Dict[str, Any]) -> List:
+        computed and self._store(computed)
+        return [computed[field] if value is _MISSING else value for field, value in zip(fields, values)]
+
+    @instrument
+    def __call__(self, *args, **kwargs) -> Any:
+        field = self._field(args, kwargs)
+        value, = self._lookup([field])
+        if value is _MISSING:
+            value = self.fn(*args, **kwargs)
+            self._store({field: value})
+        return value
+
+    def many(self, calls: Iterable) -> List:
+        """results of many calls with one MGET or HMGET, misses are computed and written with one round trip"""
+        fields, values, misses = self._plan(calls)
+        computed = {field: self.fn(*args, **kwargs) for field, (args, kwargs) in misses.items()}
+        return self._results(fields, values, computed)
+
+    def invalidate(self, *args, **kwargs) -> None:
+        field = self._field(args, kwargs)
+        if self.ttl is None:
+            self.redis.hdel(self.key, field)
+        else:
+            self.redis.delete(self._entry_key(field))
+
+    def _entry_keys(self) -> Iterator[List[bytes]]:
+        pattern = escape_glob(self.key) + ":*"
+        return _batches(self.redis.scan_iter(match=pattern, count=self.dump_chunk_size), self.dump_chunk_size)
+
+    def clear(self) -> None:
+        self.redis.delete(self.key)
+        for keys in self._entry_keys():
+            self.redis.delete(*keys)
+
+    def _dump_records(self) -> Iterator[bytes]:
+        """field and value pairs, results with ttl are loaded with a full ttl again"""
+        if self.ttl is None:
+            for k, v in self.redis.hscan_iter(self.key, count=self.dump_chunk_size):
+                yield k
+                yield v
+            return
+
+        prefix = len(self._entry_key("").encode("utf-8"))
+        for keys in self._entry_keys():
+            for k, v in zip(keys, self.redis.mget(keys)):
+                if v is not None:
+                    yield k[prefix:]
+                    yield v
+
+    def _load_batch(self, pipeline: Pipeline, records: List[bytes]) -> None:
+        fields, values = records[::2], records[1::2]
+        if self.ttl is None:
+            pipeline.hset(self.key, mapping=dict(zip(fields, values)))
+            return
+
+        for field, value in zip(fields, values):
+            pipeline.set(self._entry_key(bytes(field).decode("utf-8")), value, px=max(1, int(self.ttl * 1000)))
+
+
+class AsyncMemoized(Memoized):
+    """
+    for coroutine functions, redis is called from the default executor of the running loop, so it is never blocked.
+    Misses of many are awaited concurrently.
+    """
+    async def _run(self, func: Callable, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, in_context(func), *args)
+
+    @instrument
+    async def __call__(self, *args, **kwargs) -> Any:
+        field = self._field(args, kwargs)
+        value, = await self._run(self._lookup, [field])
+        if value is _MISSING:
+            value = await self.fn(*args, **kwargs)
+            await self._run(self._store, {field: value})
+        return value
+
+    async def many(self, calls: Iterable) -> List:
+        fields, values, misses = await self._run(self._plan, list(calls))
+        results = await asyncio.gather(*(self.fn(*args, **kwargs) for args, kwargs in misses.values()))
+        computed = dict(zip(misses, results))
+        return await self._run(self._results, fields, values, computed)
+
+
+def memoize(ttl: float = None, **kwargs: Any) -> Callable[[Callable], Memoized]:
+    """
+    @memoize(ttl=60, schema=Model) caches results across workers, fn.many(calls) looks many calls up at once.
+    kwargs are key, hash_key, schema and compressor, see Memoized.
+    """
+    def decorator(fn: Callable) -> Memoized:
+        cls = AsyncMemoized if inspect.iscoroutinefunction(fn) else Memoized
+        return cls(fn, ttl=ttl, **kwargs)
+    return decorator
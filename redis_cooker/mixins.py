@@ -1,35 +1,129 @@
+import os
 import json
+import mmap
+import time
+import struct
+import inspect
 import operator
-import functools
-from typing import Any, Optional, Union, Callable
+import itertools
+from typing import Any, Optional, Union, List, Dict, Set, Iterable, Iterator, Tuple
 
-from redis.client import Redis
+from redis.client import Redis, Pipeline
 
 from .clients import current_redis_client
+from .cursors import ScanCursor
 from .utils import temporary_key
-from .adapters import BaseAdapter
+from .adapters import BaseAdapter, BytesAdapter, BytesLike, _json_array
+from .buffers import WriteBehindBuffer
+from .compression import Compressor
+from .instrumentation import instrument, instrumented_client, active, record
 
-__all__ = ["RedisDataMixin"]
+__all__ = ["RedisDataMixin", "RedisScanMixin"]
 
 
 class RedisDataMixin:
     __class__: type = None
 
-    def __init__(self, key: str = None, *, init: Any = None, schema: Any = None):
+    _instrumented_dunders = {
+        "__getitem__", "__setitem__", "__delitem__", "__iter__", "__len__", "__contains__",
+        "__iadd__", "__imul__", "__isub__", "__ior__", "__ixor__", "__iand__",
+    }
+    _not_instrumented = {"dumps", "loads", "bulk_dumps", "bulk_loads", "validate_fields", "pin_to_primary"}
+    _write_behind_command: Optional[str] = None
+    _adapters: Dict[Any, Any] = {}
+    _initialized_keys: Set[str] = set()
+    remember_initialized_keys: bool = False
+    dump_chunk_size: int = 1000
+    load_pipeline_depth: int = 8
+    _dump_magic = b"RCK1"
+    _record_width = 1
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, attr in list(vars(cls).items()):
+            if not inspect.isfunction(attr):
+                continue
+            if name in cls._instrumented_dunders or not name.startswith("_") and name not in cls._not_instrumented:
+                setattr(cls, name, instrument(attr, f"{cls.__name__}.{name}"))
+
+    def __init__(
+            self, key: str = None, *, init: Any = None, schema: Any = None, compressor: Compressor = None,
+            write_behind: WriteBehindBuffer = None,
+    ):
         self.key: str = key or temporary_key()
         self.init = init
         self.schema = schema
-        self.adapted_schema: Optional[BaseAdapter] = None if schema else json
+        self.adapted_schema: Optional[BaseAdapter] = self._cached_adapter(schema) if schema else json
+        self.compressor = compressor
+
+        self._connect()
+
+        self.buffer = write_behind
+        if write_behind is not None:
+            assert self._write_behind_command, f"{type(self).__name__} does not support write behind"
+            write_behind.attach(self._write_behind)
+
+        self.init and self._lazy_init(self.init, fresh=key is None)
+
+    def _lazy_init(self, init: Any, fresh: bool) -> None:
+        """init is serialized and sent only when the key does not exist yet"""
+        if self.remember_initialized_keys and self.key in self._initialized_keys:
+            return
+
+        if fresh or not self.redis.exists(self.key):
+            self._init(init)
+
+        self.remember_initialized_keys and self._initialized_keys.add(self.key)
+
+    def _forget_initialized_key(self) -> None:
+        self._initialized_keys.discard(self.key)
+
+    @classmethod
+    def _cached_adapter(cls, schema: Any) -> Optional[BaseAdapter]:
+        """an adapter instance, such as PydanticAdapter(Model, validate_on_read=False), is used as it is"""
+        if isinstance(schema, BaseAdapter):
+            return schema
+        try:
+            return cls._adapters.get(schema)
+        except TypeError:
+            return None
+
+    def _write_behind(self, items: List) -> None:
+        getattr(self._redis, self._write_behind_command)(self.key, *items)
+
+    def flush(self) -> None:
+        self.buffer is not None and self.buffer.flush()
 
-        self.redis: Redis = current_redis_client()
-        self.init and self._init(self.init)
+    def _connect(self, pinned: bool = False) -> None:
+        self._pid = os.getpid()
+        self._redis: Redis = current_redis_client()
+        self._reader: Redis = self._redis if pinned else current_redis_client(read_only=True)
+
+    @property
+    def redis(self) -> Redis:
+        self._pid != os.getpid() and self._connect(self._reader is self._redis)
+        return instrumented_client(self._redis)
+
+    @property
+    def reader(self) -> Redis:
+        self._pid != os.getpid() and self._connect(self._reader is self._redis)
+        return instrumented_client(self._reader)
+
+    def __reduce__(self):
+        """pickled as a (key, options) handle, the data stays in redis"""
+        return _restore, (type(self), self.key, self._handle_options())
+
+    def _handle_options(self) -> Dict[str, Any]:
+        return {"schema": self.schema, "compressor": self.compressor}
+
+    def pin_to_primary(self) -> "RedisDataMixin":
+        """read from primary for read-your-writes consistency"""
+        self._reader = self._redis
+        return self
 
     def _init(self, init: Any) -> None:
         pass
 
-    def __del__(self):
-        self.redis.close()
-
     def __enter__(self):
         return self
 
@@ -39,7 +133,10 @@ class RedisDataMixin:
         except AttributeError:
             pass
         else:
-            exc_type is not None and self.init and self.redis.delete(self.key)
+            self.flush()
+            if exc_type is not None and self.init:
+                self.redis.delete(self.key)
+                self._forget_initialized_key()
             del self
 
     def __adaptation_chain(self, action: str, data: Union[Any, bytes]) -> Union[Any, str]:
@@ -61,19 +158,151 @@ class RedisDataMixin:
             _data = caller(target)
 
         self.adapted_schema = target
+        if target is json:
+            return _data
+
+        try:
+            self._adapters[self.schema] = target
+        except TypeError:
+            pass
+        return _data
+
+    def dumps(self, data: Any) -> Union[str, BytesLike]:
+        start = active() and time.perf_counter()
+        _data = self.__adaptation_chain("dumps", data)
+        _data = _data if self.compressor is None else self.compressor.compress(_data)
+        start and record(serialization_time=time.perf_counter() - start)
+        return _data
+
+    def loads(self, data: BytesLike) -> Any:
+        start = active() and time.perf_counter()
+        if self.compressor is not None:
+            data = self.compressor.decompress(data)
+        if isinstance(data, memoryview) and not isinstance(self.adapted_schema, BytesAdapter):
+            data = data.tobytes()
+        _data = self.__adaptation_chain("loads", data)
+        start and record(serialization_time=time.perf_counter() - start)
         return _data
 
-    dumps: Callable = functools.partialmethod(__adaptation_chain, "dumps")
-    loads: Callable = functools.partialmethod(__adaptation_chain, "loads")
+    def validate_fields(self, partial: Dict) -> Dict:
+        """validate a partial document against schema, as JSON compatible values"""
+        if self.schema is None:
+            return partial
+        if isinstance(self.adapted_schema, BaseAdapter):
+            return self.adapted_schema.validate_fields(partial)
+
+        for adapter in BaseAdapter.__subclasses__():
+            try:
+                return adapter(self.schema).validate_fields(partial)
+            except TypeError:
+                continue
+        raise TypeError(f"{self.schema} does not support partial documents")
 
     def bulk_dumps(self, *data: Any):
         for i in data:
             yield self.dumps(i)
 
-    def bulk_loads(self, *data: bytes):
-        for i in data:
-            yield self.loads(i)
+    def bulk_loads(self, *data: BytesLike):
+        """values are decoded by the adapter as one batch once it is known, and one by one otherwise"""
+        if self.compressor is not None or self.adapted_schema is None:
+            for i in data:
+                yield self.loads(i)
+            return
+
+        start = active() and time.perf_counter()
+        if isinstance(self.adapted_schema, BaseAdapter):
+            _data = self.adapted_schema.bulk_loads(list(data))
+        else:
+            _data = _json_array(data)
+        start and record(serialization_time=time.perf_counter() - start)
+        yield from _data
 
+    @instrument
     def rename(self, new) -> None:
         assert self.redis.renamenx(self.key, new), f"duplicate key name {new}"
+        self._forget_initialized_key()
         self.key = new
+
+    def _dump_records(self) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    def _load_batch(self, pipeline: Pipeline, records: List[bytes]) -> None:
+        raise NotImplementedError
+
+    @instrument
+    def dump(self, path: str) -> int:
+        """write raw serialized records to a length-prefixed binary file, chunk by chunk"""
+        self.flush()
+        records = self._dump_records()
+        count = 0
+        with open(path, "wb") as f:
+            f.write(self._dump_magic)
+            for data in records:
+                f.write(_record_header.pack(len(data)))
+                f.write(data)
+                count += 1
+        return count
+
+    @instrument
+    def load(self, path: str) -> int:
+        """read a file written by dump through mmap, and write its records with pipelines"""
+        count = 0
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            assert m[:len(self._dump_magic)] == self._dump_magic, f"{path} is not dumped by redis-cooker"
+            batches = _batches(_iter_records(m, len(self._dump_magic)), self.dump_chunk_size * self._record_width)
+            with self.redis.pipeline(transaction=False) as pipeline:
+                for batch in batches:
+                    self._load_batch(pipeline, batch)
+                    count += len(batch)
+                    len(pipeline) >= self.load_pipeline_depth and pipeline.execute()
+                pipeline.execute()
+        return count
+
+
+class RedisScanMixin:
+    """resumable and partitioned SCAN, for collections with a SCAN command such as sets and hashes"""
+    def _scan_batch(self, cursor: int, match: Optional[str], count: int) -> Tuple[int, List]:
+        raise NotImplementedError
+
+    def _scan_identity(self, record: Any) -> bytes:
+        return record
+
+    def _scan_load(self, records: List) -> Iterator:
+        return self.bulk_loads(*records)
+
+    def scan(self, cursor: int = 0, **options) -> ScanCursor:
+        """iterate from cursor, ScanCursor.cursor is the point to resume from"""
+        return ScanCursor(self, cursor, **options)
+
+    def scan_partitions(self, total: int, **options) -> List[ScanCursor]:
+        """total cursors covering the whole collection, overlapping at their boundaries only, for parallel workers"""
+        return [ScanCursor(self, partition=(index, total), **options) for index in range(total)]
+
+
+_record_header = struct.Struct(">I")
+
+
+def _iter_records(buffer: mmap.mmap, offset: int) -> Iterator[bytes]:
+    size = len(buffer)
+    while offset < size:
+        length, = _record_header.unpack_from(buffer, offset)
+        offset += _record_header.size
+        yield buffer[offset:offset + length]
+        offset += length
+
+
+def _pack_records(records: Iterator[bytes]) -> bytes:
+    return b"".join(_record_header.pack(len(i)) + bytes(i) for i in records)
+
+
+def _batches(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _restore(cls: type, key: str, options: Dict[str, Any]) -> RedisDataMixin:
+    return cls(key, **options)
@@ -0,0 +1,160 @@
+import enum
+import uuid
+from copy import copy
+from typing import Iterable, List, Tuple, Union
+
+from attr import dataclass
+from redis.client import Redis
+
+from .atomic import run_as_lua
+from .clients import current_redis_client
+
+__all__ = ["Strategy", "Decision", "RedisRateLimiter"]
+
+
+class Strategy(str, enum.Enum):
+    TOKEN_BUCKET = "token_bucket"
+    GCRA = "gcra"
+    SLIDING_WINDOW_LOG = "sliding_window_log"
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+    def __bool__(self) -> bool:
+        return self.allowed
+
+
+class RedisRateLimiter:
+    """
+    limit requests per period seconds for every key, decided by one script call on server time.
+    burst is the number of requests allowed at once, it defaults to limit.
+    """
+    key_delimiter = ":"
+
+    def __init__(
+            self, name: str, limit: int, period: float = 1.0, *, burst: int = None,
+            strategy: Strategy = Strategy.GCRA,
+    ):
+        assert limit > 0 and period > 0, "limit and period must > 0"
+        self.key = self.key_delimiter.join(["RedisCooker", type(self).__name__, name])
+        self.limit = limit
+        self.period = period
+        self.burst = burst or limit
+        self.strategy = Strategy(strategy)
+        self.redis: Redis = current_redis_client()
+
+    @property
+    def _period_ms(self) -> int:
+        return int(self.period * 1000)
+
+    def _limited_key(self, key: str) -> str:
+        return self.key_delimiter.join([self.key, f"{{{key}}}"])
+
+    @run_as_lua(
+        lambda self, key, cost: [self.burst, self.limit / self._period_ms, cost],
+        lambda self, key, cost: [self._limited_key(key)],
+    )
+    def _token_bucket(self, key: str, cost: int) -> List[int]:
+        """
+        local time = redis.call("TIME")
+        local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+        local capacity = tonumber(ARGV[1])
+        local rate = tonumber(ARGV[2])
+        local cost = tonumber(ARGV[3])
+
+        local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+        local tokens = tonumber(state[1]) or capacity
+        local ts = tonumber(state[2]) or now
+        tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+        local allowed, retry = 0, 0
+        if tokens >= cost then
+            tokens = tokens - cost
+            allowed = 1
+        else
+            retry = math.ceil((cost - tokens) / rate)
+        end
+        redis.call("HSET", KEYS[1], "tokens", tokens, "ts", now)
+        redis.call("PEXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+        return {allowed, math.floor(tokens), retry}
+        """
+        pass
+
+    @run_as_lua(
+        lambda self, key, cost: [self._period_ms / self.limit, self.burst, cost],
+        lambda self, key, cost: [self._limited_key(key)],
+    )
+    def _gcra(self, key: str, cost: int) -> List[int]:
+        """
+        local time = redis.call("TIME")
+        local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+        local interval = tonumber(ARGV[1])
+        local tolerance = interval * tonumber(ARGV[2])
+        local cost = tonumber(ARGV[3])
+
+        local tat = math.max(tonumber(redis.call("GET", KEYS[1])) or now, now)
+        local new_tat = tat + interval * cost
+        local allow_at = new_tat - tolerance
+        if allow_at <= now then
+            redis.call("SET", KEYS[1], new_tat, "PX", math.max(1, math.ceil(new_tat - now)))
+            return {1, math.floor((tolerance - (new_tat - now)) / interval), 0}
+        end
+        return {0, math.floor((tolerance - (tat - now)) / interval), math.ceil(allow_at - now)}
+        """
+        pass
+
+    @run_as_lua(
+        lambda self, key, cost: [self._period_ms, self.limit, cost, uuid.uuid4().hex],
+        lambda self, key, cost: [self._limited_key(key)],
+    )
+    def _sliding_window_log(self, key: str, cost: int) -> List[int]:
+        """
+        local time = redis.call("TIME")
+        local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+        local window = tonumber(ARGV[1])
+        local limit = tonumber(ARGV[2])
+        local cost = tonumber(ARGV[3])
+
+        redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now - window)
+        local count = redis.call("ZCARD", KEYS[1])
+        if count + cost <= limit then
+            for i = 1, cost do
+                redis.call("ZADD", KEYS[1], now, ARGV[4] .. ":" .. i)
+            end
+            redis.call("PEXPIRE", KEYS[1], window)
+            return {1, limit - count - cost, 0}
+        end
+        local oldest = redis.call("ZRANGE", KEYS[1], count + cost - limit - 1, count + cost - limit - 1, "WITHSCORES")
+        return {0, limit - count, math.max(1, tonumber(oldest[2]) + window - now)}
+        """
+        pass
+
+    def _decide(self, key: str, cost: int):
+        capacity = self.limit if self.strategy is Strategy.SLIDING_WINDOW_LOG else self.burst
+        assert 0 < cost <= capacity, f"cost {cost} can never be allowed"
+        return getattr(self, f"_{self.strategy.value}")(key, cost)
+
+    @staticmethod
+    def _decision(response: List[int]) -> Decision:
+        allowed, remaining, retry_after = response
+        return Decision(bool(allowed), max(0, int(remaining)), int(retry_after) / 1000)
+
+    def try_acquire(self, key: str, cost: int = 1) -> Decision:
+        return self._decision(self._decide(key, cost))
+
+    def try_acquire_many(self, requests: Iterable[Union[str, Tuple[str, int]]]) -> List[Decision]:
+        """decide for many keys, or (key, cost) pairs, in one pipelined round trip"""
+        batch = copy(self)
+        with self.redis.pipeline(transaction=False) as pipeline:
+            batch.redis = pipeline
+            for request in requests:
+                key, cost = (request, 1) if isinstance(request, str) else request
+                batch._decide(key, cost)
+            return [self._decision(response) for response in pipeline.execute()]
+
+    def reset(self, key: str) -> None:
+        self.redis.delete(self._limited_key(key))
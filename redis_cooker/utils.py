@@ -1,5 +1,31 @@
 import uuid
 
+from redis.cluster import RedisCluster
+from redis.crc import key_slot
 
-def temporary_key() -> str:
-    return f"RedisCooker:Temporary:{uuid.uuid4()}"
+
+def hash_tag(key: str) -> str:
+    start = key.find("{")
+    if start != -1:
+        end = key.find("}", start + 1)
+        if end > start + 1:
+            return key[start + 1:end]
+    return key
+
+
+def temporary_key(key: str = None) -> str:
+    """the temporary key is hash-tagged to the slot of key, so it can join multi-key commands in cluster"""
+    if key is None:
+        return f"RedisCooker:Temporary:{uuid.uuid4()}"
+    return f"RedisCooker:Temporary:{{{hash_tag(key)}}}:{uuid.uuid4()}"
+
+
+def escape_glob(key: str) -> str:
+    """key as a literal prefix of SCAN MATCH patterns"""
+    return "".join(f"\\{c}" if c in "*?[]\\" else c for c in key)
+
+
+def same_slot(client, *keys: str) -> bool:
+    if not isinstance(client, RedisCluster):
+        return True
+    return len({key_slot(k.encode("utf-8")) for k in keys}) <= 1
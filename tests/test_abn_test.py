@@ -1,4 +1,8 @@
+from unittest import mock
+
 import pytest
+from redis.cluster import RedisCluster
+from redis.crc import key_slot
 
 from redis_cooker.abn_test import ABNTest, Choice
 from redis_cooker.clients import current_redis_client, set_connection_url
@@ -18,6 +22,27 @@ class TestABNTest:
             assert choice in choice_names
         assert sum(int(i) for i in client.mget(abn_test.keys.keys())) == 0
 
+    def test_keys_in_same_slot(self, monkeypatch):
+        topic = "lead comment"
+        choices = [Choice(name="A", value=5), Choice(name="B", value=5), Choice(name="C", value=2)]
+        assert list(ABNTest(topic, choices).keys) == [f"RedisCooker:ABNTest:lead comment:{i.name}" for i in choices]
+
+        monkeypatch.setattr("redis_cooker.abn_test.current_redis_client", lambda: mock.MagicMock(spec=RedisCluster))
+        keys = list(ABNTest(topic, choices).keys)
+        assert keys[0] == "RedisCooker:ABNTest:{lead comment}:A"
+        assert len({key_slot(i.encode()) for i in keys}) == 1
+
+    def test_fetch_on_cluster(self, monkeypatch):
+        cluster = mock.MagicMock(spec=RedisCluster)
+        monkeypatch.setattr("redis_cooker.abn_test.current_redis_client", lambda: cluster)
+        abn_test = ABNTest("lead comment", [Choice(name="A", value=1)])
+        pipeline = cluster.pipeline.return_value.__enter__.return_value
+        pipeline.mget.return_value = [b"1"]
+        assert abn_test.fetch() == "A"
+        cluster.pipeline.assert_called_with(transaction=True)
+        pipeline.watch.assert_called_once_with("RedisCooker:ABNTest:{lead comment}:A")
+        pipeline.decr.assert_called_once_with("RedisCooker:ABNTest:{lead comment}:A")
+
     def test_value_nonzero(self):
         topic = "lead comment"
         choices = [Choice(name="A", value=5), Choice(name="C", value=0)]
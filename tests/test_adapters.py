@@ -7,6 +7,8 @@ from rest_framework import serializers
 
 from redis_cooker.collections import *
 from redis_cooker.clients import *
+from redis_cooker.adapters import PydanticAdapter, DRFAdapter
+from redis_cooker.compression import Compressor
 
 set_connection_url('redis://:@127.0.0.1:6379/15')
 client = current_redis_client()
@@ -157,6 +159,62 @@ class TestPydantic:
         str(s)
         repr(s)
 
+    def test_patch(self):
+        client.delete(self.key)
+        d = RedisDict(self.key, schema=Person, init={"a": {"name": "A", "age": 15, "sex": Sex.MALE}})
+        d.patch("a", {"age": "16", "sex": "female"})
+        assert d["a"] == {"name": "A", "age": 16, "sex": Sex.FEMALE}
+        assert d.get_field("a", "age") == 16
+        with pytest.raises(ValueError):
+            d.patch("a", {"age": "old"})
+        with pytest.raises(KeyError):
+            d.patch("a", {"height": 1})
+        with pytest.raises(KeyError):
+            d.patch("b", {"age": 1})
+        with pytest.raises(TypeError):
+            RedisDict(self.key, schema=Persons).patch("a", {"age": 1})
+
+    def test_read_modes(self):
+        client.delete(self.key)
+        original = [{"name": "A", "age": 15, "sex": Sex.MALE}, {"name": "B", "age": "16", "sex": Sex.FEMALE}]
+        RedisList(self.key, init=original, schema=Person)
+
+        trusted = RedisList(self.key, schema=PydanticAdapter(Person, validate_on_read=False))
+        assert trusted == [{"name": "A", "age": 15, "sex": "male"}, {"name": "B", "age": 16, "sex": "female"}]
+        assert trusted[1] == {"name": "B", "age": 16, "sex": "female"}
+
+        models = RedisList(self.key, schema=PydanticAdapter(Person, as_model=True))
+        assert models[0] == Person(name="A", age=15, sex=Sex.MALE)
+        assert list(models) == [Person(**i) for i in original]
+
+        constructed = list(RedisList(self.key, schema=PydanticAdapter(Person, validate_on_read=False, as_model=True)))
+        assert [type(i) for i in constructed] == [Person, Person]
+        assert constructed[1].age == 16
+
+        client.delete(self.key)
+        RedisList(self.key, init=[[original[0]]], schema=Persons)
+        assert list(RedisList(self.key, schema=PydanticAdapter(Persons, as_model=True)))[0].__root__[0].age == 15
+
+    def test_bulk_loads(self):
+        client.delete(self.key)
+        original = {str(i): {"name": str(i), "age": i, "sex": Sex.MALE} for i in range(100)}
+        d = RedisDict(self.key, init=original, schema=Person)
+        assert dict(d.items()) == original
+        assert dict(RedisDict(self.key, schema=PydanticAdapter(Person, validate_on_read=False)).items()) == {
+            k: {**v, "sex": "male"} for k, v in original.items()
+        }
+
+    def test_adapter_cache(self):
+        client.delete(self.key)
+
+        class Member(BaseModel):
+            age: int
+
+        RedisDict(self.key, schema=Member)["a"] = {"age": "not a number"}
+        assert RedisDict(self.key, schema=Member).adapted_schema is None
+        RedisDict(self.key, schema=Member)["b"] = {"age": "1"}
+        assert isinstance(RedisDict(self.key, schema=Member).adapted_schema, PydanticAdapter)
+
 
 class DRFPerson(serializers.Serializer):
     name = serializers.CharField()
@@ -253,3 +311,71 @@ class TestDRF:
             assert d[k] == DRFGroup(v).data
         str(d)
         repr(d)
+
+    def test_patch(self):
+        client.delete(self.key)
+        d = RedisDict(self.key, schema=DRFPerson, init={"a": {"name": "A", "age": 15, "sex": Sex.MALE}})
+        d.patch("a", {"age": "16"})
+        assert d["a"] == {"name": "A", "age": 16, "sex": Sex.MALE}
+        with pytest.raises(KeyError):
+            d.patch("a", {"height": 1})
+
+    def test_read_modes(self):
+        client.delete(self.key)
+        original = [{"name": "A", "age": 15, "sex": Sex.MALE}, {"name": "B", "age": "16", "sex": Sex.FEMALE}]
+        RedisList(self.key, init=original, schema=DRFPerson)
+        assert RedisList(self.key, schema=DRFAdapter(DRFPerson, validate_on_read=False)) == [
+            {"name": "A", "age": 15, "sex": "male"}, {"name": "B", "age": 16, "sex": "female"},
+        ]
+
+
+class TestCompression:
+    key = "Testing:Compression"
+
+    def test_redis_dict(self):
+        client.delete(self.key)
+        compressor = Compressor(threshold=64)
+        large = {"members": ["Hello World"] * 100}
+        d = RedisDict(self.key, init={"small": "Hello", "large": large}, compressor=compressor)
+        assert client.hget(self.key, "small") == b'"Hello"'
+        assert client.hget(self.key, "large").startswith(Compressor.marker)
+        assert d["small"] == "Hello"
+        assert d["large"] == large
+        assert d.data == {"small": "Hello", "large": large}
+        assert compressor.ratio > 1
+
+    def test_redis_list(self):
+        client.delete(self.key)
+        large = "Hello World" * 100
+        l = RedisList(self.key, init=[large, "Hello"], compressor=Compressor(threshold=64))
+        assert large in l
+        assert l.pop() == "Hello"
+        assert l.pop() == large
+
+    def test_marker_in_raw_values(self):
+        client.delete(self.key)
+        values = [Compressor.marker + b"z not compressed", Compressor.marker, b"Hello"]
+        l = RedisList(self.key, init=values, schema=bytes, compressor=Compressor(threshold=64))
+        assert client.lindex(self.key, 0) == Compressor.marker + b"r" + values[0]
+        assert client.lindex(self.key, 2) == b"Hello"
+        assert [bytes(i) for i in l] == values
+
+
+class TestBytes:
+    key = "Testing:Bytes"
+
+    def test_redis_list(self):
+        client.delete(self.key)
+        l = RedisList(self.key, init=[b"Hello"], schema=bytes)
+        l.append(memoryview(b"World"))
+        l.append(bytearray(b"\x00\xff"))
+        assert l == [b"Hello", b"World", b"\x00\xff"]
+        with pytest.raises(TypeError):
+            l.append("oops")
+
+    def test_redis_string(self):
+        client.delete(self.key)
+        s = RedisString(self.key, init="Hello")
+        assert s.raw_data == b"Hello"
+        assert bytes(s) == b"Hello"
+        assert s == "Hello"
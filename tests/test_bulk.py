@@ -0,0 +1,58 @@
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from redis_cooker import bulk
+from redis_cooker.bulk import load
+from redis_cooker.clients import *
+from redis_cooker.collections import *
+
+set_connection_url('redis://:@127.0.0.1:6379/15')
+client = current_redis_client()
+
+
+class TestLoad:
+    key = "Testing:Bulk"
+
+    def test_redis_list(self):
+        client.delete(self.key)
+        reports = []
+        stats = load(RedisList(self.key), (i for i in range(2500)), batch_size=100, connections=4, progress=reports.append)
+        assert stats.rows == 2500
+        assert stats.rows_per_second > 0
+        assert reports
+        assert RedisList(self.key) == list(range(2500))
+
+    def test_redis_dict(self):
+        client.delete(self.key)
+        original = {str(i): {"value": i} for i in range(1000)}
+        load(RedisDict(self.key), original, batch_size=64, connections=3, pipeline_depth=2)
+        assert RedisDict(self.key) == original
+
+    def test_redis_mutable_set(self):
+        client.delete(self.key)
+        load(RedisMutableSet(self.key), range(1000), batch_size=128, workers=2)
+        assert RedisMutableSet(self.key) == set(range(1000))
+
+    def test_spawned_workers(self, monkeypatch):
+        client.delete(self.key)
+        spawn = multiprocessing.get_context("spawn")
+        monkeypatch.setattr(bulk, "ProcessPoolExecutor", functools.partial(ProcessPoolExecutor, mp_context=spawn))
+        load(RedisList(self.key), range(100), batch_size=10, workers=2)
+        assert RedisList(self.key) == list(range(100))
+
+    def test_unsupported(self):
+        with pytest.raises(TypeError):
+            load(RedisString(self.key), "Hello")
+
+    def test_nested(self):
+        client.delete(self.key)
+        d = RedisDict(self.key, nested=RedisList)
+        with pytest.raises(AssertionError):
+            load(d, {"a": [1, 2]})
+        assert not client.exists(self.key)
+        d.update({"a": [1, 2]})
+        assert d["a"] == [1, 2]
+        d.clear()
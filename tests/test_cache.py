@@ -0,0 +1,129 @@
+import time
+import pickle
+import threading
+
+import pytest
+
+from redis_cooker.cache import RedisCache
+from redis_cooker.clients import *
+
+set_connection_url('redis://:@127.0.0.1:6379/15')
+client = current_redis_client()
+
+
+class TestRedisCache:
+    key = "Testing:RedisCache"
+
+    def test_get_or_compute(self):
+        cache = RedisCache(self.key)
+        cache.clear()
+        assert cache.get_or_compute("a", lambda: {"value": 1}) == {"value": 1}
+        assert cache.get_or_compute("a", lambda: {"value": 2}) == {"value": 1}
+        assert RedisCache(self.key).get_or_compute("a", lambda: {"value": 3}) == {"value": 1}
+        assert cache.stats.computes == 1 and cache.stats.local_hits == 1 and cache.stats.misses == 1
+        assert cache.stats.hit_ratio == 0.5
+        assert 0 < client.pttl(f"{self.key}:a") <= 300000
+
+    def test_single_flight(self):
+        cache = RedisCache(self.key)
+        cache.clear()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("a", compute))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == ["value"] * 8
+        assert len(calls) == 1 and cache.stats.waits == 7
+
+    def test_cross_process_lock(self):
+        cache, other = RedisCache(self.key), RedisCache(self.key)
+        cache.clear()
+        started = threading.Event()
+
+        def compute():
+            started.set()
+            time.sleep(0.1)
+            return "value"
+
+        leader = threading.Thread(target=cache.get_or_compute, args=("a", compute))
+        leader.start()
+        started.wait()
+        assert other.get_or_compute("a", lambda: "other") == "value"
+        leader.join()
+        assert other.stats.computes == 0 and other.stats.waits == 1
+
+    def test_early_refresh(self):
+        cache = RedisCache(self.key, local_ttl=0)
+        cache.clear()
+        cache.get_or_compute("a", lambda: 1, ttl=1)
+        assert cache.get_or_compute("a", lambda: 2) == 1
+        cache.beta = 10 ** 9
+        cache.get_or_compute("a", lambda: 3)
+        assert cache.stats.early_refreshes == 1
+        assert cache["a"] == 3
+
+    def test_negative(self):
+        cache = RedisCache(self.key, negative_ttl=0.05)
+        cache.clear()
+        assert cache.get_or_compute("a", lambda: None) is None
+        assert RedisCache(self.key).get_or_compute("a", lambda: 1) is None
+        assert 0 < client.pttl(f"{self.key}:a") <= 50
+        time.sleep(0.1)
+        assert RedisCache(self.key).get_or_compute("a", lambda: 1) == 1
+
+    def test_mapping(self):
+        cache = RedisCache(self.key, maxsize=1)
+        cache.clear()
+        cache["a"] = [1]
+        cache.set("b", [2], ttl=10)
+        assert list(cache._local) == ["b"]
+        assert cache["a"] == [1] and "b" in cache
+        del cache["b"]
+        assert "b" not in cache
+        with pytest.raises(KeyError):
+            _ = cache["b"]
+        assert pickle.loads(pickle.dumps(cache)).maxsize == 1
+        cache.clear()
+        assert not client.exists(f"{self.key}:a")
+
+    def test_init(self):
+        RedisCache(self.key).clear()
+        RedisCache(self.key).set("a", 1)
+        cache = RedisCache(self.key, init={"a": 2, "b": 3, "c": None})
+        assert cache["a"] == 1 and cache["b"] == 3 and cache["c"] is None
+        with pytest.raises(ZeroDivisionError):
+            with RedisCache(self.key, init={"d": 4}):
+                _ = 1 / 0
+        assert not client.keys(f"{self.key}:*")
+
+    def test_rename(self):
+        RedisCache(self.key).clear()
+        RedisCache("Testing:Renamed").clear()
+        cache = RedisCache(self.key)
+        cache.set("a", 1, ttl=10)
+        cache.set("b", None)
+        cache.rename("Testing:Renamed")
+        assert cache.key == "Testing:Renamed" and not client.keys(f"{self.key}:*")
+        assert RedisCache("Testing:Renamed")["a"] == 1 and RedisCache("Testing:Renamed")["b"] is None
+        assert 0 < client.pttl("Testing:Renamed:a") <= 10000
+        cache.clear()
+
+    def test_dump(self, tmp_path):
+        cache = RedisCache(self.key)
+        cache.clear()
+        cache.set("a", {"value": 1}, ttl=10)
+        cache.set("b", None)
+        path = str(tmp_path / "cache")
+        assert cache.dump(path) == 4
+        cache.clear()
+        assert cache.load(path) == 4
+        assert RedisCache(self.key)["a"] == {"value": 1} and "b" in cache
+        assert 0 < client.pttl(f"{self.key}:a") <= 10000
@@ -0,0 +1,26 @@
+from redis_cooker.clients import *
+from redis_cooker.collections import RedisDict
+
+set_connection_url('redis://:@127.0.0.1:6379/15')
+client = current_redis_client()
+
+
+class TestReadPolicy:
+    key = "Testing:ReadPolicy"
+
+    def test_replica(self):
+        client.delete(self.key)
+        set_replica_urls('redis://:@127.0.0.1:6379/15')
+        set_read_policy(ReadPolicy.REPLICA)
+        try:
+            d = RedisDict(self.key, init={"Hello": "World"})
+            assert d.reader is not d.redis
+            assert d["Hello"] == "World"
+            assert d.pin_to_primary().reader is d.redis
+        finally:
+            set_read_policy(ReadPolicy.PRIMARY)
+            set_replica_urls()
+
+    def test_primary(self):
+        d = RedisDict(self.key)
+        assert d.reader is d.redis
@@ -1,10 +1,18 @@
+import os
+import time
+import pickle
+import queue
 from copy import copy
 from collections import deque, defaultdict
 
 import pytest
+from redis.exceptions import ResponseError
 
 from redis_cooker.collections import *
 from redis_cooker.clients import *
+from redis_cooker.buffers import WriteBehindBuffer
+from redis_cooker.compression import Compressor
+from redis_cooker.mixins import RedisDataMixin
 
 set_connection_url('redis://:@127.0.0.1:6379/15')
 client = current_redis_client()
@@ -277,7 +285,7 @@ class TestRedisList:
 
     def test_insert(self):
         item = "item"
-        for index in [-2, -1, 0, 1]:
+        for index in [-20, -2, -1, 0, 1, 20]:
             client.delete(self.key)
             l = RedisList(self.key, init=self.original)
             original = copy(self.original)
@@ -285,6 +293,11 @@ class TestRedisList:
             original.insert(index, item)
             assert l == original
 
+        client.delete(self.key)
+        l = RedisList(self.key, init=[b"a", b"__REPLACE_MARK__", b"b", b"c"], schema=bytes)
+        l.insert(3, b"x")
+        assert client.lrange(self.key, 0, -1) == [b"a", b"__REPLACE_MARK__", b"b", b"x", b"c"]
+
     def test_pop(self):
         for index in [-2, -1, 0, 1]:
             client.delete(self.key)
@@ -302,6 +315,33 @@ class TestRedisList:
         original.remove(item)
         assert l == original
 
+        with pytest.raises(ValueError):
+            l.remove("oops")
+
+    def test_index(self):
+        client.delete(self.key)
+        l = RedisList(self.key, init=self.original)
+        for item in set(self.original):
+            assert l.index(item) == self.original.index(item)
+        for start, stop in [(3, 10), (4, -1), (-3, 100), (-100, 3)]:
+            assert l.index("l", start, stop) == self.original.index("l", start, stop)
+        with pytest.raises(ValueError):
+            l.index("l", 4, 8)
+        with pytest.raises(ValueError):
+            l.index("oops")
+
+    def test_count(self):
+        client.delete(self.key)
+        l = RedisList(self.key, init=self.original)
+        for item in ["l", "o", "H", "oops"]:
+            assert l.count(item) == self.original.count(item)
+
+    def test___contains__(self):
+        client.delete(self.key)
+        l = RedisList(self.key, init=self.original)
+        assert "W" in l
+        assert "oops" not in l
+
     def test_clear(self):
         client.delete(self.key)
         l = RedisList(self.key, init=self.original)
@@ -331,6 +371,22 @@ class TestRedisList:
         original.sort(reverse=True)
         assert l == original
 
+        client.delete(self.key)
+        original = [10, 9, 100, 2.5, -1]
+        l = RedisList(self.key, init=original)
+        l.sort()
+        assert l == sorted(original)
+
+        client.delete(self.key)
+        original = [{"name": i, "age": 20 - len(i)} for i in ["Tom", "Amy", "Bob", "Lucy", "Al", "Eve", "Jack"]]
+        l = RedisList(self.key, init=original)
+        l.sort_chunk_size = 3
+        for key in [lambda x: x["name"], lambda x: x["age"]]:
+            for reverse in [False, True]:
+                l.sort(key=key, reverse=reverse)
+                original.sort(key=key, reverse=reverse)
+                assert l == original
+
     def test___setitem__(self):
         item = "Z"
         for index in [-2, -1, 0, 1]:
@@ -373,6 +429,25 @@ class TestRedisList:
         original[0:4] = ["a", "b", "c", "d", "e", "f", "g"]
         assert l == original
 
+        slices = [
+            slice(None), slice(2, 5), slice(5, 2), slice(-3, None), slice(None, -8), slice(7, 100),
+            slice(None, None, -1), slice(1, None, 3), slice(8, 1, -2), slice(-1, -100, -4),
+        ]
+        for index in slices:
+            for size in [0, 2, 9]:
+                client.delete(self.key)
+                l = RedisList(self.key, init=["__PLACEHOLDER__", "__POINTER__", *self.original])
+                original = ["__PLACEHOLDER__", "__POINTER__", *self.original]
+                value = list(range(size))
+                try:
+                    original[index] = value
+                except ValueError:
+                    with pytest.raises(ValueError):
+                        l[index] = value
+                else:
+                    l[index] = value
+                assert l == original
+
     def test___delitem__(self):
         for index in [-2, -1, 0, 1]:
             client.delete(self.key)
@@ -401,6 +476,26 @@ class TestRedisList:
         client.delete(self.key)
         l = RedisList(self.key, init=self.original)
         del l[0:]
+        assert l == []
+
+        slices = [
+            slice(None), slice(2, 5), slice(5, 2), slice(-3, None), slice(None, -8), slice(7, 100),
+            slice(None, None, -1), slice(1, None, 3), slice(8, 1, -2), slice(-1, -100, -4), slice(None, None, 2),
+        ]
+        for index in slices:
+            client.delete(self.key)
+            l = RedisList(self.key, init=["__PLACEHOLDER__", *self.original])
+            original = ["__PLACEHOLDER__", *self.original]
+            del l[index]
+            del original[index]
+            assert l == original
+
+        for index in [1, 5, 9, -2, -10]:
+            client.delete(self.key)
+            l = RedisList(self.key, init=["_DELETED_MARK_", *self.original])
+            original = ["_DELETED_MARK_", *self.original]
+            assert l.pop(index) == original.pop(index)
+            assert l == original
 
     def test___reversed__(self):
         client.delete(self.key)
@@ -442,6 +537,12 @@ class TestRedisDict:
     key = "Testing:RedisDict"
     original = {"Hello": "World"}
 
+    def test_items_of_invalid_values(self):
+        client.delete(self.key)
+        client.hset(self.key, mapping={"a": "1, 2", "b": "3"})
+        with pytest.raises(ValueError):
+            list(RedisDict(self.key).items())
+
     def test__init(self):
         client.delete(self.key)
         d = RedisDict(self.key, init=self.original)
@@ -574,6 +675,79 @@ class TestRedisDict:
         assert repr(d) == repr(original)
 
 
+class TestPatch:
+    key = "Testing:Patch"
+
+    def test_patch(self):
+        client.delete(self.key)
+        document = {"a": "}\\\"{", "b": [1, {"c": "]"}], "d": None, "e": 1.5}
+        d = RedisDict(self.key, init={"doc": document, "empty": {}})
+        d.patch("doc", {"b": [], "e": 2, "f": {"g": True}})
+        assert d["doc"] == {**document, "b": [], "e": 2, "f": {"g": True}}
+        assert d.get_field("doc", "a") == document["a"]
+        assert d.get_field("doc", "f") == {"g": True}
+        with pytest.raises(KeyError):
+            d.get_field("doc", "z")
+
+        d.patch("empty", {"a": 1})
+        assert d["empty"] == {"a": 1}
+        d["list"] = [1]
+        with pytest.raises(ResponseError):
+            d.patch("list", {"a": 1})
+
+
+class TestNestedRedisDict:
+    key = "Testing:NestedRedisDict"
+
+    def test_nested(self):
+        client.delete(self.key, f"{self.key}:a", f"{self.key}:b")
+        d = RedisDict(self.key, nested=RedisList, init={"a": [1, 2]})
+        assert client.hget(self.key, "a") == f"{self.key}:a".encode()
+        d["a"].append(3)
+        assert client.lrange(f"{self.key}:a", 0, -1) == [b"1", b"2", b"3"]
+        assert d["a"] == [1, 2, 3]
+
+        d["a"] = [4]
+        d["b"] = []
+        assert dict(d.items()) == {"a": [4], "b": []}
+        assert type(d["b"]) is RedisList
+
+        del d["a"]
+        assert not client.exists(f"{self.key}:a")
+        with pytest.raises(KeyError):
+            del d["a"]
+
+        d["b"].extend([5, 6])
+        d.clear()
+        assert not client.exists(self.key, f"{self.key}:b")
+
+    def test_nested_default(self):
+        client.delete(self.key, f"{self.key}:a")
+        d = RedisDefaultDict(self.key, default_factory=dict, nested=RedisDict)
+        d["a"]["x"] = 1
+        assert client.hget(f"{self.key}:a", "x") == b"1"
+        assert d.get_many_with_default("a", "b") == [{"x": 1}, {}]
+        assert type(pickle.loads(pickle.dumps(d))["a"]) is RedisDict
+        with pytest.raises(AssertionError):
+            d.rename("Testing:Renamed")
+        assert client.exists(self.key)
+        d.clear()
+
+    def test_nested_dump(self, tmp_path):
+        client.delete(self.key, f"{self.key}:a", f"{self.key}:b", "Testing:Loaded", "Testing:Loaded:a", "Testing:Loaded:b")
+        d = RedisDict(self.key, nested=RedisList, init={"a": [1, 2, 3], "b": []})
+        path = str(tmp_path / "nested")
+        assert d.dump(path) == 4
+
+        loaded = RedisDict("Testing:Loaded", nested=RedisList)
+        client.rpush("Testing:Loaded:a", 0)
+        assert loaded.load(path) == 4
+        assert dict(loaded.items()) == {"a": [1, 2, 3], "b": []}
+        assert client.hget("Testing:Loaded", "a") == b"Testing:Loaded:a"
+        d.clear()
+        loaded.clear()
+
+
 class TestRedisDeque:
     key = "Testing:RedisDeque"
     original = ['H', 'e', 'l', 'l', 'o', 'W', 'o', 'r', 'l', 'd']
@@ -664,3 +838,304 @@ class TestRedisDefaultDict:
         assert ("WOW" in r) != ("WOW" in d)
         _ = d["WOW"]
         assert ("WOW" in r) == ("WOW" in d)
+
+    def test_concurrent_default(self):
+        client.delete(self.key)
+        r = RedisDefaultDict(self.key, default_factory=list)
+        client.hset(self.key, "items", r.dumps(["first"]))
+        assert r.__missing__("items") == ["first"]
+        assert r["items"] == ["first"]
+
+    def test_get_many_with_default(self):
+        client.delete(self.key)
+        r = RedisDefaultDict(self.key, default_factory=list, init={"Hello": ["World"]})
+        assert r.get_many_with_default("Hello", "WOW", "WOW") == [["World"], [], []]
+        assert r.data == {"Hello": ["World"], "WOW": []}
+        assert r.get_many_with_default() == []
+        with pytest.raises(AssertionError):
+            RedisDefaultDict(self.key).get_many_with_default("Missing")
+
+
+class TestLazyInit:
+    key = "Testing:LazyInit"
+
+    def test_existed_key(self):
+        client.delete(self.key)
+        RedisList(self.key, init=["Hello"])
+        l = RedisList(self.key, init=[object()])
+        assert l == ["Hello"]
+
+    def test_remember_initialized_keys(self):
+        class RememberedList(RedisList):
+            remember_initialized_keys = True
+
+        client.delete(self.key)
+        l = RememberedList(self.key, init=["Hello"])
+        client.delete(self.key)
+        assert RememberedList(self.key, init=["World"]) == []
+        l.clear()
+        assert RememberedList(self.key, init=["World"]) == ["World"]
+
+
+class TestWriteBehind:
+    key = "Testing:WriteBehind"
+
+    def test_redis_list(self):
+        client.delete(self.key)
+        buffer = WriteBehindBuffer(batch_size=3, interval=60)
+        l = RedisList(self.key, write_behind=buffer)
+        l.append("Hello")
+        l.append("World")
+        assert len(l) == 0
+        l.flush()
+        assert l == ["Hello", "World"]
+
+        l.extend(["A", "B", "C"])
+        buffer.close()
+        assert l == ["Hello", "World", "A", "B", "C"]
+
+    def test_redis_mutable_set(self):
+        client.delete(self.key)
+        with RedisMutableSet(self.key, write_behind=WriteBehindBuffer(interval=0.01)) as s:
+            s.add("Hello")
+            s.update("World", "Hello")
+            time.sleep(0.1)
+            assert s == {"Hello", "World"}
+
+    def test_backpressure(self):
+        client.delete(self.key)
+        l = RedisList(self.key, write_behind=WriteBehindBuffer(batch_size=1, capacity=1, interval=60, timeout=0.01))
+        l.buffer.sink = lambda items: time.sleep(0.5)
+        l.append("Hello")
+        time.sleep(0.05)
+        l.append("World")
+        with pytest.raises(queue.Full):
+            l.append("oops")
+
+
+class TestPickle:
+    key = "Testing:Pickle"
+
+    def test_handles(self):
+        client.delete(self.key)
+        d = RedisDefaultDict(self.key, default_factory=list, init={"Hello": ["World"]})
+        restored = pickle.loads(pickle.dumps(d))
+        assert type(restored) is RedisDefaultDict
+        assert restored.key == d.key
+        assert restored["Hello"] == ["World"]
+        assert restored["oops"] == []
+
+        l = RedisList(compressor=Compressor(threshold=1))
+        restored = pickle.loads(pickle.dumps(l))
+        assert restored.compressor.threshold == 1
+
+    def test_fork(self):
+        l = RedisList(self.key)
+        l._pid = -1
+        assert l.redis is client
+        assert l._pid == os.getpid()
+
+
+class TestDumpAndLoad:
+    key = "Testing:Dump"
+
+    def test_collections(self, tmp_path):
+        cases = [
+            (RedisDict, {str(i): {"value": i} for i in range(2500)}),
+            (RedisList, list(range(2500))),
+            (RedisDeque, deque("Hello World")),
+            (RedisMutableSet, set(range(2500))),
+            (RedisString, "Hello World"),
+        ]
+        for cls, original in cases:
+            client.delete(self.key)
+            path = str(tmp_path / cls.__name__)
+            c = cls(self.key, init=original)
+            c.dump(path)
+            client.delete(self.key)
+            c.load(path)
+            assert c == original
+
+    def test_strings(self, tmp_path):
+        client.delete(self.key)
+        path = str(tmp_path / "strings")
+        for cls, options in ((RedisBloomFilter, {"capacity": 1000, "error_rate": 0.01}), (RedisHyperLogLog, {})):
+            c = cls(self.key, init=range(100), **options)
+            if client.type(self.key) != b"string":
+                pytest.skip("HyperLogLog is not a string on this server")
+            raw = client.get(self.key)
+            assert c.dump(path) == 1
+            client.delete(self.key)
+            assert c.load(path) == 1
+            assert client.get(self.key) == raw
+            assert 95 <= len(c) <= 105
+            client.delete(self.key)
+
+    def test_unsupported(self, tmp_path):
+        path = tmp_path / "unsupported"
+        with pytest.raises(NotImplementedError):
+            RedisDataMixin(self.key).dump(str(path))
+        assert not path.exists()
+
+    def test_raw_records(self, tmp_path):
+        client.delete(self.key)
+        path = str(tmp_path / "compressed")
+        large = "Hello World" * 100
+        l = RedisList(self.key, init=[large, "Hello"], compressor=Compressor(threshold=64))
+        raw = client.lrange(self.key, 0, -1)
+        assert l.dump(path) == 2
+        client.delete(self.key)
+        assert RedisList(self.key).load(path) == 2
+        assert client.lrange(self.key, 0, -1) == raw
+
+    def test_empty(self, tmp_path):
+        client.delete(self.key)
+        path = str(tmp_path / "empty")
+        assert RedisDict(self.key).dump(path) == 0
+        assert RedisDict(self.key).load(path) == 0
+
+
+class TestScanCursor:
+    key = "Testing:Scan"
+
+    def test_resume(self):
+        client.delete(self.key)
+        original = set(range(2500))
+        s = RedisMutableSet(self.key, init=original)
+        cursor = s.scan(count=100)
+        seen = set()
+        for i in cursor:
+            seen.add(i)
+            if len(seen) == 1000:
+                break
+        assert not cursor.finished
+
+        resumed = s.scan(cursor.cursor, count=100)
+        seen.update(resumed)
+        assert resumed.finished
+        assert seen == original
+
+    def test_dedup(self):
+        client.delete(self.key)
+        d = RedisDict(self.key, init={str(i): i for i in range(100)})
+        cursor = d.scan(count=10)
+        assert sorted(cursor) == sorted((str(i), i) for i in range(100))
+        assert list(cursor) == []
+
+        assert len(list(d.items())) == 100
+        assert sorted(d) == sorted(str(i) for i in range(100))
+
+    def test_partitions(self):
+        client.delete(self.key)
+        original = set(range(2500))
+        s = RedisMutableSet(self.key, init=original)
+        partitions = [list(cursor) for cursor in s.scan_partitions(4, count=10)]
+        assert set().union(*partitions) == original
+        assert sum(map(len, partitions)) <= len(original) * 1.25
+        assert not hasattr(RedisList(self.key), "scan")
+
+        client.delete(self.key)
+        s = RedisMutableSet(self.key, init={1, 2, 3})
+        assert [set(cursor) for cursor in s.scan_partitions(2)][0] == {1, 2, 3}
+        with pytest.raises(AssertionError):
+            s.scan_partitions(3)
+
+
+class TestRedisHyperLogLog:
+    key = "Testing:RedisHyperLogLog"
+
+    def test_add_and_len(self):
+        client.delete(self.key)
+        h = RedisHyperLogLog(self.key, init=range(1000))
+        assert not h.add(1)
+        assert h.add("Hello")
+        assert abs(len(h) - 1001) < 50
+
+    def test_merge(self):
+        client.delete(self.key)
+        h = RedisHyperLogLog(self.key, init=range(1000))
+        other = RedisHyperLogLog(init=range(500, 1500))
+        union = h | other
+        assert abs(len(union) - 1500) < 75
+        assert abs(len(h) - 1000) < 50
+        h |= other
+        assert len(h) == len(union)
+        h.clear()
+        assert len(h) == 0
+
+
+class TestRedisBloomFilter:
+    key = "Testing:RedisBloomFilter"
+
+    def test_add_and_contains(self):
+        client.delete(self.key)
+        b = RedisBloomFilter(self.key, capacity=1000, error_rate=0.01)
+        assert b.size == 9586 and b.hashes == 7
+        assert b.update(*range(1000)).count(True) > 990
+        assert all(b.contains_many(*range(1000)))
+        assert 0 in b and "Hello" not in b
+        assert b.add("Hello") and not b.add("Hello")
+        assert sum(b.contains_many(*range(1000, 11000))) < 200
+        assert abs(len(b) - 1001) < 50
+
+    def test_positions(self, monkeypatch):
+        import redis_cooker.collections as collections
+        data = [str(i).encode() for i in range(100)]
+        vectorized = collections._bloom_positions(data, 7, 9586)
+        monkeypatch.setattr(collections, "numpy", None)
+        assert collections._bloom_positions(data, 7, 9586) == vectorized
+
+    def test_pickle(self):
+        client.delete(self.key)
+        b = RedisBloomFilter(self.key, capacity=100, error_rate=0.001, init=["Hello"])
+        restored = pickle.loads(pickle.dumps(b))
+        assert restored.size == b.size and "Hello" in restored
+
+
+class TestRedisBitmap:
+    key = "Testing:RedisBitmap"
+
+    def test_getitem_and_setitem(self):
+        client.delete(self.key)
+        b = RedisBitmap(self.key, init=[0, 9])
+        assert len(b) == 16
+        assert b[0] == 1 and b[1] == 0 and b[9] == 1 and b[-7] == 1
+        b[1] = 1
+        assert bytes(b) == b"\xc0\x40"
+        with pytest.raises(IndexError):
+            _ = b[-17]
+
+    def test_set_many_and_count(self):
+        client.delete(self.key)
+        b = RedisBitmap(self.key)
+        indices = list(range(0, 5000, 3))
+        assert b.set_many(indices) == [0] * len(indices)
+        assert b.get_many([0, 1, 2, 3]) == [1, 0, 0, 1]
+        assert b.count() == len(indices)
+        assert b.count(range(3, 12)) == 3
+        assert b.count(range(3, 3)) == 0
+        assert b.set_many([0, 3], 0) == [1, 1]
+        assert b.count() == len(indices) - 2
+
+    def test_bitop(self):
+        client.delete(self.key)
+        a = RedisBitmap(self.key, init=b"\xf0")
+        b = RedisBitmap(init=b"\x3c")
+        assert (a & b).to_bytes() == b"\x30"
+        assert (a | b).to_bytes() == b"\xfc"
+        assert (a ^ b).to_bytes() == b"\xcc"
+        assert (~a).to_bytes() == b"\x0f"
+        a |= b
+        assert a.to_bytes() == b"\xfc"
+
+    def test_numpy(self):
+        numpy = pytest.importorskip("numpy")
+        client.delete(self.key)
+        bits = numpy.zeros(20, dtype=bool)
+        bits[[1, 5, 19]] = True
+        b = RedisBitmap(self.key).from_numpy(bits)
+        assert b.count() == 3 and b[19] == 1
+        assert b.to_numpy()[:20].tolist() == bits.tolist()
+        assert b.to_numpy(packed=True).tolist() == [0x44, 0x00, 0x10]
+        assert RedisBitmap().from_numpy(b.to_numpy(packed=True), packed=True).to_bytes() == b"\x44\x00\x10"
+        assert RedisBitmap().from_numpy(b.to_numpy()).to_bytes() == b"\x44\x00\x10"
@@ -0,0 +1,60 @@
+from redis.cluster import RedisCluster
+
+from redis_cooker.clients import *
+from redis_cooker.collections import RedisDict, RedisList
+from redis_cooker.instrumentation import subscribe, unsubscribe, instrumented_client, _Running, Operation
+from redis_cooker.utils import same_slot
+
+set_connection_url('redis://:@127.0.0.1:6379/15')
+client = current_redis_client()
+
+
+class TestInstrumentation:
+    key = "Testing:Instrumentation"
+
+    def test_operations(self):
+        client.delete(self.key)
+        operations = []
+        subscribe(operations.append)
+        try:
+            d = RedisDict(self.key)
+            d["Hello"] = "World"
+            assert d["Hello"] == "World"
+            assert list(d.items()) == [("Hello", "World")]
+        finally:
+            unsubscribe(operations.append)
+
+        setitem, getitem, items = [i for i in operations if i.depth == 0]
+        assert setitem.name == "RedisDict.__setitem__"
+        assert setitem.key == self.key
+        assert setitem.round_trips == 1
+        assert setitem.bytes_out > len('"World"')
+        assert getitem.bytes_in == len('"World"')
+        assert getitem.serialization_time > 0
+        assert items.name == "RedisDict.items"
+        assert items.round_trips >= 1
+
+    def test_lua(self):
+        client.delete(self.key)
+        operations = []
+        subscribe(operations.append)
+        try:
+            l = RedisList(self.key, init=["Hello", "World"])
+            l.reverse()
+        finally:
+            unsubscribe(operations.append)
+
+        assert [i.name for i in operations] == ["RedisList._init:lua", "RedisList.reverse:lua", "RedisList.reverse"]
+        assert operations[-1].round_trips >= 1
+
+    def test_disabled(self):
+        client.delete(self.key)
+        d = RedisDict(self.key)
+        assert d.redis is d._redis
+
+    def test_cluster_client(self):
+        cluster = RedisCluster.__new__(RedisCluster)
+        with _Running(Operation("test")):
+            proxy = instrumented_client(cluster)
+        assert proxy is not cluster and isinstance(proxy, RedisCluster)
+        assert not same_slot(proxy, "a", "b")
@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+from redis_cooker.collections import RedisDict
+from redis_cooker.clients import *
+from redis_cooker.locks import *
+
+set_connection_url('redis://:@127.0.0.1:6379/15')
+client = current_redis_client()
+
+
+class TestRedisLock:
+    name = "Testing:Lock"
+
+    def test_acquire_and_release(self):
+        client.delete(RedisLock(self.name).key)
+        a, b = RedisLock(self.name), RedisLock(self.name, blocking=False)
+        assert a.acquire()
+        assert a.owned() and a.locked()
+        assert not b.acquire()
+        assert a.release()
+        assert not a.locked()
+        assert b.acquire()
+        assert b.release()
+
+    def test_fencing_token(self):
+        lock = RedisLock(self.name)
+        with lock:
+            first = lock.fencing_token
+        with lock:
+            assert lock.fencing_token > first
+
+    def test_expire_and_extend(self):
+        client.delete(RedisLock(self.name).key)
+        lock = RedisLock(self.name, timeout=0.05)
+        lock.acquire()
+        assert lock.extend()
+        client.delete(lock.key)
+        assert not lock.extend()
+        assert not lock.release()
+
+    def test_auto_extend(self):
+        client.delete(RedisLock(self.name).key)
+        lock = RedisLock(self.name, timeout=0.1, auto_extend=True)
+        with lock:
+            threading.Event().wait(0.3)
+            assert lock.owned()
+        assert not lock.locked()
+
+    def test_blocking_timeout(self):
+        client.delete(RedisLock(self.name).key)
+        with RedisLock(self.name):
+            with pytest.raises(TimeoutError):
+                with RedisLock(self.name, blocking_timeout=0.05):
+                    pass
+
+
+class TestRedisSemaphore:
+    name = "Testing:Semaphore"
+
+    def test_limit(self):
+        client.delete(RedisSemaphore(self.name, 2).key)
+        holders = [RedisSemaphore(self.name, 2, blocking=False) for _ in range(3)]
+        assert holders[0].acquire()
+        assert holders[1].acquire()
+        assert not holders[2].acquire()
+        assert holders[0].release()
+        assert holders[2].acquire()
+        assert holders[1].extend()
+        assert holders[1].release() and holders[2].release()
+
+    def test_expired_holder(self):
+        client.delete(RedisSemaphore(self.name, 1).key)
+        crashed = RedisSemaphore(self.name, 1, timeout=0.05)
+        crashed.acquire()
+        threading.Event().wait(0.1)
+        assert not crashed.extend()
+        with RedisSemaphore(self.name, 1, blocking_timeout=0.1) as s:
+            assert s.fencing_token > crashed.fencing_token
+
+
+class TestAtomicUpdate:
+    key = "Testing:AtomicUpdate"
+
+    def test_atomic_update(self):
+        client.delete(self.key)
+        d = RedisDict(self.key)
+        assert d.atomic_update("counter", lambda v: v + 1, default=0) == 1
+
+        def increase():
+            for _ in range(20):
+                d.atomic_update("counter", lambda v: v + 1, retries=1000)
+
+        threads = [threading.Thread(target=increase) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert d["counter"] == 81
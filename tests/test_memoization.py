@@ -0,0 +1,156 @@
+import pickle
+import asyncio
+import threading
+
+import pytest
+from pydantic import BaseModel
+
+import redis_cooker
+from redis_cooker.clients import *
+from redis_cooker.instrumentation import subscribe, unsubscribe
+from redis_cooker.memoization import AsyncMemoized
+
+set_connection_url('redis://:@127.0.0.1:6379/15')
+client = current_redis_client()
+
+calls = []
+
+
+class Point(BaseModel):
+    x: int
+    y: int
+
+
+@redis_cooker.memoize(ttl=60, key="Testing:{Memoize}:square", schema=Point)
+def square(x: int, scale: int = 1) -> dict:
+    calls.append(x)
+    return {"x": x * x * scale, "y": x}
+
+
+@redis_cooker.memoize(key="Testing:Memoize:add")
+def add(x, y):
+    calls.append((x, y))
+    return x + y
+
+
+@redis_cooker.memoize(ttl=60, key="Testing:{Memoize}:fetch")
+async def fetch(x):
+    calls.append(x)
+    await asyncio.sleep(0)
+    return [x]
+
+
+class TestMemoize:
+    def setup_method(self):
+        square.clear()
+        add.clear()
+        fetch.clear()
+        calls.clear()
+
+    def test_call(self):
+        assert square(3) == {"x": 9, "y": 3}
+        assert square(3) == square(x=3) == square(3, scale=1) == {"x": 9, "y": 3}
+        assert square(3, 2) == {"x": 18, "y": 3}
+        assert calls == [3, 3]
+        assert 0 < client.pttl(f"Testing:{{Memoize}}:square:{square._field((3,), {})}") <= 60000
+        assert square.__name__ == "square" and square.__wrapped__(2) == {"x": 4, "y": 2}
+
+    def test_hash(self):
+        assert add(1, 2) == add(1, 2) == 3
+        assert add(1, 3) == 4
+        assert calls == [(1, 2), (1, 3)]
+        assert client.hlen("Testing:Memoize:add") == 2
+        add.invalidate(1, 2)
+        assert add(1, 2) == 3 and len(calls) == 3
+
+    def test_many(self):
+        assert square(2) == {"x": 4, "y": 2}
+        assert square.many([1, 2, 3, 1]) == [{"x": x * x, "y": x} for x in (1, 2, 3, 1)]
+        assert calls == [2, 1, 3]
+        assert square.many([]) == []
+        assert add.many([(1, 2), (2, 3)]) == [3, 5]
+        assert add.many([(2, 3)]) == [5] and len(calls) == 5
+
+    def test_async(self):
+        assert isinstance(fetch, AsyncMemoized)
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(fetch(1)) == [1]
+            assert loop.run_until_complete(fetch(1)) == [1]
+            assert loop.run_until_complete(fetch.many([1, 2, 3])) == [[1], [2], [3]]
+        finally:
+            loop.close()
+        assert calls == [1, 2, 3]
+
+    def test_async_io_off_loop(self, monkeypatch):
+        threads = []
+        lookup = fetch._lookup
+        monkeypatch.setattr(fetch, "_lookup", lambda fields: threads.append(threading.get_ident()) or lookup(fields))
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(fetch(1)) == [1]
+            assert loop.run_until_complete(fetch.many([1, (2,)])) == [[1], [2]]
+        finally:
+            loop.close()
+        assert len(threads) == 2 and threading.get_ident() not in threads
+
+    def test_instrumentation(self):
+        operations = []
+        subscribe(operations.append)
+        try:
+            square.many([1, 2])
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(fetch(1))
+            finally:
+                loop.close()
+        finally:
+            unsubscribe(operations.append)
+
+        many, call = [i for i in operations if i.depth == 0]
+        assert many.name == "Memoized.many" and call.name == "AsyncMemoized.__call__"
+        assert many.hashing_time > 0 and many.serialization_time > 0
+        assert many.round_trips == 2 and call.round_trips == 2
+
+    def test_method(self):
+        class Account:
+            def __init__(self, id):
+                self.id = id
+
+            @redis_cooker.memoize(key="Testing:Memoize:balance", hash_key=lambda self, day: [self.id, day])
+            def balance(self, day):
+                calls.append(day)
+                return self.id * day
+
+        Account.balance.clear()
+        assert Account(2).balance(3) == Account(2).balance(day=3) == 6
+        assert Account(3).balance(3) == 9
+        assert calls == [3, 3]
+        Account.balance.clear()
+
+    def test_unhashable(self):
+        class Opaque:
+            pass
+
+        with pytest.raises(TypeError):
+            add(Opaque(), 1)
+        assert calls == []
+
+    def test_dump(self, tmp_path):
+        square(2)
+        add(1, 2)
+        for memoized, count in ((square, 2), (add, 2)):
+            path = str(tmp_path / memoized.__name__)
+            assert memoized.dump(path) == count
+            memoized.clear()
+            assert memoized.load(path) == count
+        assert square(2) == {"x": 4, "y": 2} and add(1, 2) == 3
+        assert calls == [2, (1, 2)]
+        assert 0 < client.pttl(f"Testing:{{Memoize}}:square:{square._field((2,), {})}") <= 60000
+
+    def test_pickle(self):
+        assert pickle.loads(pickle.dumps(square)) is square
+
+    def test_unbound(self):
+        with pytest.raises(TypeError):
+            add(1)
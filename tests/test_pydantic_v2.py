@@ -0,0 +1,79 @@
+import enum
+from typing import List
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+if not pydantic.VERSION.startswith("2"):
+    pytest.skip("pydantic v2 is not installed", allow_module_level=True)
+
+from pydantic import BaseModel, Field, RootModel, ValidationError
+
+from redis_cooker.adapters import PydanticV2Adapter
+from redis_cooker.collections import *
+from redis_cooker.clients import *
+
+set_connection_url('redis://:@127.0.0.1:6379/15')
+client = current_redis_client()
+
+
+class Sex(str, enum.Enum):
+    MALE = 'male'
+    FEMALE = 'female'
+
+
+class Person(BaseModel):
+    name: str
+    age: int = Field(ge=0)
+    sex: Sex
+
+
+class Persons(RootModel):
+    root: List[Person]
+
+
+class TestPydanticV2:
+    key = "Testing:PydanticV2"
+    original = [{"name": "A", "age": 15, "sex": Sex.MALE}, {"name": "B", "age": "16", "sex": Sex.FEMALE}]
+
+    def test_redis_list(self):
+        client.delete(self.key)
+        l = RedisList(self.key, init=self.original, schema=Person)
+        assert type(l.adapted_schema) is PydanticV2Adapter
+        assert client.lindex(self.key, 0) == b'{"name":"A","age":15,"sex":"male"}'
+        assert l == [{"name": "A", "age": 15, "sex": Sex.MALE}, {"name": "B", "age": 16, "sex": Sex.FEMALE}]
+        assert l[1] == {"name": "B", "age": 16, "sex": Sex.FEMALE}
+        with pytest.raises(ValidationError):
+            l.append({"name": "C", "age": -1, "sex": Sex.MALE})
+
+    def test_read_modes(self):
+        client.delete(self.key)
+        RedisList(self.key, init=self.original, schema=Person)
+        models = RedisList(self.key, schema=PydanticV2Adapter(Person, as_model=True))
+        assert list(models) == [Person(**i) for i in self.original]
+        trusted = RedisList(self.key, schema=PydanticV2Adapter(Person, validate_on_read=False, as_model=True))
+        assert [i.age for i in trusted] == [15, 16]
+        assert RedisList(self.key, schema=PydanticV2Adapter(Person, validate_on_read=False))[0]["sex"] == "male"
+
+    def test_root_model(self):
+        client.delete(self.key)
+        d = RedisDict(self.key, init={"a": self.original}, schema=Persons)
+        assert d["a"] == [{"name": "A", "age": 15, "sex": Sex.MALE}, {"name": "B", "age": 16, "sex": Sex.FEMALE}]
+        trusted = RedisDict(self.key, schema=PydanticV2Adapter(Persons, validate_on_read=False, as_model=True))
+        assert trusted["a"].root[1]["age"] == 16
+
+    def test_patch(self):
+        client.delete(self.key)
+        d = RedisDict(self.key, schema=Person, init={"a": self.original[0]})
+        d.patch("a", {"age": "16", "sex": "female"})
+        assert d["a"] == {"name": "A", "age": 16, "sex": Sex.FEMALE}
+        with pytest.raises(ValidationError):
+            d.patch("a", {"age": -1})
+        with pytest.raises(KeyError):
+            d.patch("a", {"height": 1})
+
+    def test_bulk_loads_of_invalid_values(self):
+        client.delete(self.key)
+        client.rpush(self.key, b'{"name":"A","age":15,"sex":"male"}, {"name":"B","age":16,"sex":"male"}')
+        with pytest.raises(ValidationError):
+            list(RedisList(self.key, schema=Person))
@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from redis_cooker.clients import *
+from redis_cooker.rate_limit import *
+
+set_connection_url('redis://:@127.0.0.1:6379/15')
+client = current_redis_client()
+
+
+class TestRedisRateLimiter:
+    name = "Testing:RateLimiter"
+
+    def limiters(self, limit: int, period: float):
+        for strategy in Strategy:
+            limiter = RedisRateLimiter(f"{self.name}:{strategy.value}", limit, period, strategy=strategy)
+            limiter.reset("user")
+            yield limiter
+
+    def test_try_acquire(self):
+        for limiter in self.limiters(5, 60):
+            decisions = [limiter.try_acquire("user") for _ in range(6)]
+            assert all(decisions[:5]), limiter.strategy
+            assert decisions[4].remaining == 0
+            assert not decisions[5]
+            assert 0 < decisions[5].retry_after <= 60
+            assert limiter.try_acquire("another user")
+
+    def test_refill(self):
+        for limiter in self.limiters(2, 0.1):
+            assert limiter.try_acquire("user", 2)
+            assert not limiter.try_acquire("user")
+            time.sleep(0.15)
+            assert limiter.try_acquire("user"), limiter.strategy
+
+    def test_cost(self):
+        for limiter in self.limiters(5, 60):
+            assert limiter.try_acquire("user", 3)
+            assert not limiter.try_acquire("user", 3)
+            assert limiter.try_acquire("user", 2)
+            with pytest.raises(AssertionError):
+                limiter.try_acquire("user", 6)
+
+    def test_try_acquire_many(self):
+        for limiter in self.limiters(3, 60):
+            limiter.reset("another user")
+            decisions = limiter.try_acquire_many(["user", "user", ("user", 2), ("another user", 3)])
+            assert [bool(i) for i in decisions] == [True, True, False, True], limiter.strategy
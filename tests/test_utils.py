@@ -0,0 +1,30 @@
+from redis.cluster import RedisCluster
+from redis.crc import key_slot
+
+from redis_cooker.clients import *
+from redis_cooker.utils import hash_tag, temporary_key, same_slot
+
+set_connection_url('redis://:@127.0.0.1:6379/15')
+client = current_redis_client()
+
+
+class TestUtils:
+    def test_hash_tag(self):
+        assert hash_tag("Testing:RedisDict") == "Testing:RedisDict"
+        assert hash_tag("Testing:{user}:RedisDict") == "user"
+        assert hash_tag("{a}{b}") == "a"
+        assert hash_tag("Testing:{}:RedisDict") == "Testing:{}:RedisDict"
+        assert hash_tag("Testing:{user") == "Testing:{user"
+
+    def test_temporary_key(self):
+        assert temporary_key().startswith("RedisCooker:Temporary:")
+        assert temporary_key() != temporary_key()
+        for key in ("Testing:RedisDict", "Testing:{user}:RedisDict"):
+            assert key_slot(temporary_key(key).encode()) == key_slot(key.encode())
+
+    def test_same_slot(self):
+        assert same_slot(client, "a", "b")
+        cluster = RedisCluster.__new__(RedisCluster)
+        assert not same_slot(cluster, "a", "b")
+        assert same_slot(cluster, "a", temporary_key("a"), "{a}:b")
+        assert same_slot(cluster, "a")